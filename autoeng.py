@@ -1,8 +1,30 @@
+import io
+import sys
 import wave
 import struct
 import os
+import re
+import mmap
+import zipfile
+import math
+import argparse
+import csv
+import json
+import time
+import hashlib
 import datetime
-from typing import List, Tuple, Optional
+import threading
+import queue
+from collections import OrderedDict
+from functools import lru_cache
+from contextlib import closing, contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy为可选依赖，未安装时只能使用列表后端
+    np = None
 
 # 常量定义
 SAMPLE_RATE = 44100
@@ -13,6 +35,33 @@ CROSS_FADE_VOWEL = 0.01  # 元音间交叉淡化时间（秒）
 CONSONANT_OVERLAP_PERCENT = 0.55  # 辅音55%处开始元音
 END_CONSONANT_FADE_PERCENT = 0.3  # 特殊结尾辅音交叉淡化比例（元音时长的30%）
 END_CONSONANT_RETAIN_PERCENT = 0.1  # 普通结尾辅音保留比例（10%）
+PARALLEL_CHUNK_SIZE = 4  # 进程池每次分发给工作进程的录音条数
+PIPELINE_DEPTH = 4  # 流水线模式下各阶段之间队列的容量（录音条数）
+FADE_TABLE_CACHE_SIZE = 512  # 缓存的淡化系数表数量（按长度和曲线）
+SOURCE_LEVELS = {'peak': -1.0, 'rms': -20.0}  # 音源增益匹配的默认目标电平（dBFS）
+SOURCE_MAX_GAIN_DB = 12.0  # 音源增益匹配的最大提升（dB），避免放大底噪
+OUTPUT_LEVELS = {'peak': -1.0, 'rms': -20.0}  # 输出归一化的默认目标电平（dBFS）
+MIN_SAMPLE_DURATION = 0.02  # 预检时音源时长低于此值（秒）给出警告
+SAMPLE_BANK_MAX_BYTES = 64 * 1024 * 1024  # 样本缓存上限（字节，按各后端每个采样的内存占用计算）
+SYLLABLE_CACHE_MAX_BYTES = 8 * 1024 * 1024  # 音节渲染缓存上限（字节），0表示不缓存
+FADE_CURVE = 'linear'  # 交叉淡化曲线：linear（线性）或 equal_power（等功率）
+BUILD_MANIFEST_NAME = ".build_manifest.json"  # 增量构建清单文件名（位于输出目录）
+PLAN_CACHE_NAME = ".render_plans.json"  # 渲染计划缓存文件名（位于输出目录）
+PLAN_CACHE_VERSION = 4
+CONVERT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "autoeng", "converted")  # 格式转换缓存目录
+SOURCE_GAINS_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "autoeng", "source_gains.json")  # 音源增益缓存文件
+RESAMPLE_ZERO_CROSSINGS = 16  # 重采样滤波器单侧零点数（越大过渡带越窄）
+RESAMPLE_COEF_BITS = 16  # 重采样滤波器系数的定点精度（位）
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE  # 实际编码由子格式GUID的前两个字节给出
+WAVE_FORMAT_NAMES = {WAVE_FORMAT_PCM: "PCM", WAVE_FORMAT_IEEE_FLOAT: "浮点"}
+OTO_CV_ALIAS = "{c}{v}"  # CV别名格式（如 ba）
+OTO_VC_ALIAS = "{v} {c}"  # VC别名格式（如 a b）
+OTO_V_ALIAS = "{v}"  # 元音别名格式
+OTO_OVERLAP_RATIO = 1 / 3  # 重叠位置占先行发声的比例
+OTO_VC_LEAD = 0.1  # VC别名在辅音前保留的元音长度（秒）
+OTO_ENCODING = 'cp932'  # oto.ini编码（UTAU默认Shift-JIS）
 
 # 辅音列表（更新以包含新增辅音）
 CONSONANTS = ['b', 'ch', 'd', 'th', 'f', 'g', 'h', 'j', 'dr', 'k', 'l', 'm', 'n', 'ng', 'p', 'r', 's', 'sh', 't', 'v', 'w', 'y', 'z',
@@ -32,6 +81,151 @@ VOWEL_MAPPING = {
     'ew': 'ew'
 }
 
+# 内置录音表映射关系（更新以包含新的音节组合），未指定 --mapping 时使用
+DEFAULT_MAPPING_TABLE = [
+    "aa-iy-aa-uw-aa-eh → a_i_a_u_a_e",
+    "eh-aa-ow-aa-ay-iy → e_a_ou_a_ai_i",
+    "iy-uw-iy-eh-iy-ow → i_u_i_e_i_ou",
+    "ow-iy-ay-uw-eh-uw → ou_i_ai_u_e_u",
+    "uw-ow-uw-ay-eh-ow → u_ou_u_ai_e_ou",
+    "ow-eh-ay-ow-ay-aa → ou_e_ai_ou_ai_a",
+    "naa-niy-nuw-neh-now-nayn → n-a_n-i_n-u_n-e_n-ou_n-ai-n",
+    "ngaa-ngiy-nguw-ngeh-ngow-ngayng → ng-a_ng-i_ng-u_ng-e_ng-ou_ng-ai-ng",
+    "baa-biy-buw-beh-bow-bayb → b-a_b-i_b-u_b-e_b-ou_b-ai-b",
+    "chaa-chiy-chuw-cheh-chow-chaych → ch-a_ch-i_ch-u_ch-e_ch-ou_ch-ai-ch",
+    "daa-diy-duw-deh-dow-dayd → d-a_d-i_d-u_d-e_d-ou_d-ai-d",
+    "dhaa-dhiy-dhuw-dheh-dhow-dhaydh → th-a_th-i_th-u_th-e_th-ou_th-ai-th",
+    "faa-fiy-fuw-feh-fow-fayf → f-a_f-i_f-u_f-e_f-ou_f-ai-f",
+    "gaa-giy-guw-geh-gow-gayg → g-a_g-i_g-u_g-e_g-ou_g-ai-g",
+    "hhaa-hhiy-hhuw-hhe-hhow-hhayhh → h-a_h-i_h-u_h-e_h-ou_h-ai-h",
+    "jhaa-jhiy-jhuw-jheh-jhow-jhayjh → j-a_j-i_j-u_j-e_j-ou_j-ai-j",
+    "kaa-kiy-kuw-keh-kow-kayk → k-a_k-i_k-u_k-e_k-ou_k-ai-k",
+    "laa-liy-luw-leh-low-layl → l-a_l-i_l-u_l-e_l-ou_l-ai-l",
+    "maa-miy-muw-meh-mow-maym → m-a_m-i_m-u_m-e_m-ou_m-ai-m",
+    "paa-piy-puw-peh-pow-payp → p-a_p-i_p-u_p-e_p-ou_p-ai-p",
+    "qaa-qiy-quw-qeh-qow-qayq → k-a_k-i_k-u_k-e_k-ou_k-ai-k",
+    "raa-riy-ruw-reh-row-rayr → r-a_r-i_r-u_r-e_r-ou_r-ai-r",
+    "saa-siy-suw-seh-sow-says → s-a_s-i_s-u_s-e_s-ou_s-ai-s",
+    "shaa-shiy-shuw-sheh-show-shaysh → sh-a_sh-i_sh-u_sh-e_sh-ou_sh-ai-sh",
+    "taa-tiy-tuw-teh-tow-tayt → t-a_t-i_t-u_t-e_t-ou_t-ai-t",
+    "vaa-viy-vuw-veh-vow-vayv → v-a_v-i_v-u_v-e_v-ou_v-ai-v",
+    "waa-wiy-wuw-weh-wow-wayw → w-a_w-i_w-u_w-e_w-ou_w-ai-w",
+    "yaa-yi-yuw-yeh-yow-yayy → y-a_y-i_y-u_y-e_y-ou_y-ai-y",
+    "zaa-ziy-zuw-zeh-zow-zay → z-a_z-i_z-u_z-e_z-ou_z-ai",
+    "ae-ao-ae-ih-ae-uh-ae → e_o_e_i_e_a_e",
+    "ae-aw-ae-ey-ae-oy-ao → e_o_e_ei_e_oi_o",
+    "ao-ih-ao-uh-ao-aw-ao → o_i_o_a_o_o_o",
+    "ao-ey-ao-oy-ih-uh-ih → o_ei_o_oi_i_a_i",
+    "ih-aw-ih-ey-ih-oy-uh → i_o_i_ei_i_oi_a",
+    "uh-aw-uh-ey-uh-oy-aw → a_o_a_ei_a_oi_o",
+    "aw-ey-aw-oy-ey-oy-ae → o_ei_o_oi_ei_oi_e",
+    "bae-bao-bih-buh-baw-bey-boyb → b-e_b-o_b-i_b-a_b-o_b-ei_b-oi-b",
+    "chae-chao-chih-chuh-chaw-chey-choych → ch-e_ch-o_ch-i_ch-a_ch-o_ch-ei_ch-oi-ch",
+    "dae-dao-dih-duh-daw-dey-doyd → d-e_d-o_d-i_d-a_d-o_d-ei_d-oi-d",
+    "dhae-dhao-dhih-dhuh-dhaw-dhey-dhoydh → th-e_th-o_th-i_th-a_th-o_th-ei_th-oi-th",
+    "fae-fao-fih-fuh-faw-fey-foyf → f-e_f-o_f-i_f-a_f-o_f-ei_f-oi-f",
+    "gae-gao-gih-guh-gaw-gey-goyg → g-e_g-o_g-i_g-a_g-o_g-ei_g-oi-g",
+    "hhae-hhao-hhih-hhuh-hhaw-hhey-hhoyh → h-e_h-o_h-i_h-a_h-o_h-ei_h-oi-h",
+    "jhae-jhao-jhih-jhuh-jhaw-jhey-jhoyj → j-e_j-o_j-i_j-a_j-o_j-ei_j-oi-j",
+    "kae-kao-kih-kuh-kaw-key-koyk → k-e_k-o_k-i_k-a_k-o_k-ei_k-oi-k",
+    "lae-lao-lih-luh-law-ley-loyl → l-e_l-o_l-i_l-a_l-o_l-ei_l-oi-l",
+    "mae-mao-mih-muh-maw-mey-moym → m-e_m-o_m-i_m-a_m-o_m-ei_m-oi-m",
+    "nae-nao-nih-nuh-naw-ney-noyn → n-e_n-o_n-i_n-a_n-o_n-ei_n-oi-n",
+    "ngae-ngao-ngih-nguh-ngaw-ngey-ngoyng → ng-e_ng-o_ng-i_ng-a_ng-o_ng-ei_ng-oi-ng",
+    "pae-pao-pih-puh-paw-pey-poyp → p-e_p-o_p-i_p-a_p-o_p-ei_p-oi-p",
+    "qae-qao-qih-quh-qaw-qey-qoyq → k-e_k-o_k-i_k-a_k-o_k-ei_k-oi-k",
+    "rae-rao-rih-ruh-raw-rey-royr → r-e_r-o_r-i_r-a_r-o_r-ei_r-oi-r",
+    "sae-sao-sih-suh-saw-sey-soys → s-e_s-o_s-i_s-a_s-o_s-ei_s-oi-s",
+    "shae-shao-shih-shuh-shaw-shey-shoysh → sh-e_sh-o_sh-i_sh-a_sh-o_sh-ei_sh-oi-sh",
+    "tae-tao-tih-tuh-taw-tey-toyt → t-e_t-o_t-i_t-a_t-o_t-ei_t-oi-t",
+    "vae-vao-vih-vuh-vaw-vey-voyv → v-e_v-o_v-i_v-a_v-o_v-ei_v-oi-v",
+    "wae-wao-wih-wuh-waw-wey-woyw → w-e_w-o_w-i_w-a_w-o_w-ei_w-oi-w",
+    "yae-yao-yih-yuh-yaw-yey-yoyy → y-e_y-o_y-i_y-a_y-o_y-ei_y-oi-y",
+    "zae-zao-zih-zuh-zaw-zey-zoyz → z-e_z-o_z-i_z-a_z-o_z-ei_z-oi-z",
+    # 新增的音节组合
+    "thae-thao-thih-thuh-thaw-they-thoyth → th-e_th-o_th-i_th-a_th-o_th-ei_th-oi-th",
+    "zhae-zhao-zhih-zhuh-zhaw-zhey-zhoyzh → zh-e_zh-o_zh-i_zh-a_zh-o_zh-ei_zh-oi-zh",
+    "thah-thax-ther-thahth-thaxth-therth → th-a_th-ax_th-er_th-a-th_th-ax-th_th-er-th",
+    "bah-bao-bih-buh-baw-bey-boyb → b-a_b-o_b-i_b-a_b-o_b-ei_b-oi-b",
+    "bah-bax-ber-bahb-baxb-berb → b-a_b-ax_b-er_b-a-b_b-ax-b_b-er-b",
+    "pah-pao-pih-puh-paw-pey-poyp → p-a_p-o_p-i_p-a_p-o_p-ei_p-oi-p",
+    "pah-pax-per-pahp-paxp-perp → p-a_p-ax_p-er_p-a-p_p-ax-p_p-er-p",
+    "dah-dao-dih-duh-daw-dey-doyd → d-a_d-o_d-i_d-a_d-o_d-ei_d-oi-d",
+    "dah-dax-der-dahd-daxd-derd → d-a_d-ax_d-er_d-a-d_d-ax-d_d-er-d",
+    "tah-tao-tih-tuh-taw-tey-toyt → t-a_t-o_t-i_t-a_t-o_t-ei_t-oi-t",
+    "tah-tax-ter-taht-taxt-tert → t-a_t-ax_t-er_t-a-t_t-ax-t_t-er-t",
+    "gah-gao-gih-guh-gaw-gey-goyg → g-a_g-o_g-i_g-a_g-o_g-ei_g-oi-g",
+    "gah-gax-ger-gahg-gaxg-gerg → g-a_g-ax_g-er_g-a-g_g-ax-g_g-er-g",
+    "kah-kao-kih-kuh-kaw-key-koyk → k-a_k-o_k-i_k-a_k-o_k-ei_k-oi-k",
+    "kah-kax-ker-kahk-kaxk-kerk → k-a_k-ax_k-er_k-a-k_k-ax-k_k-er-k",
+    "vah-vao-vih-vuh-vaw-vey-voyv → v-a_v-o_v-i_v-a_v-o_v-ei_v-oi-v",
+    "vah-vax-ver-vahv-vaxv-verv → v-a_v-ax_v-er_v-a-v_v-ax-v_v-er-v",
+    "fah-fao-fih-fuh-faw-fey-foyf → f-a_f-o_f-i_f-a_f-o_f-ei_f-oi-f",
+    "fah-fax-fer-fahf-faxf-ferf → f-a_f-ax_f-er_f-a-f_f-ax-f_f-er-f",
+    "dhah-dhao-dhih-dhuh-dhaw-dhey-dhoydh → th-a_th-o_th-i_th-a_th-o_th-ei_th-oi-th",
+    "dhah-dhax-dher-dhahdh-dhaxdh-dherdh → th-a_th-ax_th-er_th-a-th_th-ax-th_th-er-th",
+    "zah-zao-zih-zuh-zaw-zey-zoyz → z-a_z-o_z-i_z-a_z-o_z-ei_z-oi-z",
+    "zah-zax-zer-zahz-zaxz-zerz → z-a_z-ax_z-er_z-a-z_z-ax-z_z-er-z",
+    "sah-sao-sih-suh-saw-sey-soys → s-a_s-o_s-i_s-a_s-o_s-ei_s-oi-s",
+    "sah-sax-ser-sahs-saxs-sers → s-a_s-ax_s-er_s-a-s_s-ax-s_s-er-s",
+    "zhah-zhao-zhih-zhuh-zhaw-zhey-zhoyzh → zh-a_zh-o_zh-i_zh-a_zh-o_zh-ei_zh-oi-zh",
+    "zhah-zhax-zher-zhahzh-zhaxzh-zherzh → zh-a_zh-ax_zh-er_zh-a-zh_zh-ax-zh_zh-er-zh",
+    "shah-shao-shih-shuh-shaw-shey-shoysh → sh-a_sh-o_sh-i_sh-a_sh-o_sh-ei_sh-oi-sh",
+    "shah-shax-sher-shahsh-shaxsh-shersh → sh-a_sh-ax_sh-er_sh-a-sh_sh-ax-sh_sh-er-sh",
+    "jah-jao-jih-juh-jaw-jey-joyj → j-a_j-o_j-i_j-a_j-o_j-ei_j-oi-j",
+    "jah-jax-jher-jahjh-jaxjh-jherjh → j-a_j-ax_j-er_j-a-j_j-ax-j_j-er-j",
+    "chah-chao-chih-chuh-chaw-chey-choych → ch-a_ch-o_ch-i_ch-a_ch-o_ch-ei_ch-oi-ch",
+    "chah-chax-cher-chahch-chaxch-cherch → ch-a_ch-ax_ch-er_ch-a-ch_ch-ax-ch_ch-er-ch",
+    "hha-hhao-hhih-hhuh-hhaw-hhey-hhoyhh → h-a_h-o_h-i_h-a_h-o_h-ei_h-oi-h",
+    "hha-hhax-hher-hhahh-hhaxh-hherh → h-a_h-ax_h-er_h-a-h_h-ax-h_h-er-h",
+    "lah-lao-lih-luh-law-ley-loyl → l-a_l-o_l-i_l-a_l-o_l-ei_l-oi-l",
+    "lah-lax-ler-lahl-laxl-lerl → l-a_l-ax_l-er_l-a-l_l-ax-l_l-er-l",
+    "rah-rao-rih-ruh-raw-rey-royr → r-a_r-o_r-i_r-a_r-o_r-ei_r-oi-r",
+    "rah-rax-rer-rahr-raxr-rerr → r-a_r-ax_r-er_r-a-r_r-ax-r_r-er-r",
+    "yah-yao-yih-yuh-yaw-yey-yoyy → y-a_y-o_y-i_y-a_y-o_y-ei_y-oi-y",
+    "yah-yax-yer-yahy-yaxy-yery → y-a_y-ax_y-er_y-a-y_y-ax-y_y-er-y",
+    "wah-wao-wih-wuh-waw-wey-woyw → w-a_w-o_w-i_w-a_w-o_w-ei_w-oi-w",
+    "wah-wax-wer-wahw-waxw-werw → w-a_w-ax_w-er_w-a-w_w-ax-w_w-er-w",
+    "mah-mao-mih-muh-maw-mey-moym → m-a_m-o_m-i_m-a_m-o_m-ei_m-oi-m",
+    "mah-max-mer-mahm-maxm-merm → m-a_m-ax_m-er_m-a-m_m-ax-m_m-er-m",
+    "nah-nao-nih-nuh-naw-ney-noyn → n-a_n-o_n-i_n-a_n-o_n-ei_n-oi-n",
+    "nah-nax-ner-nahn-naxn-ner → n-a_n-ax_n-er_n-a-n_n-ax-n_n-er-n",
+    "ngah-ngao-ngih-nguh-ngaw-ngey-ngoyng → ng-a_ng-o_ng-i_ng-a_ng-o_ng-ei_ng-oi-ng",
+    "ngah-ngax-nger-ngahng-ngaxng-ngerng → ng-a_ng-ax_ng-er_ng-a-ng_ng-ax-ng_ng-er-ng",
+    # 新增的录音表
+    "ae-aa-ae-iy-ae-uw-ae → ae_aa_ae_iy_ae_uw_ae",
+    "ae-eh-ae-ow-ae-ay-ae → ae_eh_ae_ow_ae_ay_ae",
+    "iy-aa-iy-eh-iy-ow-iy → iy_aa_iy_eh_iy_ow_iy",
+    "iy-uw-iy-ay-iy-aa-iy → iy_uw_iy_ay_iy_aa_iy",
+    "uw-eh-uw-ay-uw-aa-uw → uw_eh_uw_ay_uw_aa_uw",
+    "eh-iy-eh-uw-eh-ay-eh → eh_iy_eh_uw_eh_ay_eh",
+    "ay-aa-ay-iy-ay-uw-ay → ay_aa_ay_iy_ay_uw_ay",
+    "oy-eh-oy-ow-oy-aa-oy → oy_eh_oy_ow_oy_aa_oy",
+    "bey-boy-baa-biy-buw-bey → b-ey_b-oy_b-aa_b-iy_b-uw_b-ey",
+    "pey-poy-paa-piy-puw-pey → p-ey_p-oy_p-aa_p-iy_p-uw_p-ey",
+    "dey-doy-daa-diy-duw-dey → d-ey_d-oy_d-aa_d-iy_d-uw_d-ey",
+    "tey-toy-taa-tiy-tuw-tey → t-ey_t-oy_t-aa_t-iy_t-uw_t-ey",
+    "gey-goy-gaa-giy-guw-gey → g-ey_g-oy_g-aa_g-iy_g-uw_g-ey",
+    "key-koy-kaa-kiy-kuw-key → k-ey_k-oy_k-aa_k-iy_k-uw_k-ey",
+    "vey-voy-vaa-viy-vuw-vey → v-ey_v-oy_v-aa_v-iy_v-uw_v-ey",
+    "fey-foy-faa-fiy-fuw-fey → f-ey_f-oy_f-aa_f-iy_f-uw_f-ey",
+    "thew-thoy-thaa-thiy-thuw-thew → th-ew_th-oy_th-aa_th-iy_th-uw_th-ew",
+    "zhey-zhoy-zhaa-zhiy-zhuw-zhey → zh-ey_zh-oy_zh-aa_zh-iy_zh-uw_zh-ey",
+    "jey-joy-jhaa-jhiy-jhuw-jey → j-ey_j-oy_j-aa_j-iy_j-uw_j-ey",
+    "chey-choy-chaa-chiy-chuw-chey → ch-ey_ch-oy_ch-aa_ch-iy_ch-uw_ch-ey",
+    "hhey-hhoy-hhaa-hhiy-hhuw-hhey → hh-ey_hh-oy_hh-aa_hh-iy_hh-uw_hh-ey",
+    "ley-loy-laa-liy-luw-ley → l-ey_l-oy_l-aa_l-iy_l-uw_l-ey",
+    "rey-roy-raa-riy-ruw-rey → r-ey_r-oy_r-aa_r-iy_r-uw_r-ey",
+    "yey-yoy-yaa-yiy-yuw-yey → y-ey_y-oy_y-aa_y-iy_y-uw_y-ey",
+    "wey-woy-waa-wiy-wuw-wey → w-ey_w-oy_w-aa_w-iy_w-uw_w-ey",
+    "mey-moy-maa-miy-muw-mey → m-ey_m-oy_m-aa_m-iy_m-uw_m-ey",
+    "ney-noy-naa-niy-nuw-ney → n-ey_n-oy_n-aa_n-iy_n-uw_n-ey",
+    "ngey-ngoy-ngaa-ngiy-nguw-ngey → ng-ey_ng-oy_ng-aa_ng-iy_ng-uw_ng-ey",
+    "sey-soy-saa-siy-suw-sey → s-ey_s-oy_s-aa_s-iy_s-uw_s-ey",
+    "zey-zoy-zaa-ziy-zuw-zey → z-ey_z-oy_z-aa_z-iy_z-uw_z-ey",
+    "shey-shoy-shaa-shiy-shuw-shey → sh-ey_sh-oy_sh-aa_sh-iy_sh-uw_sh-ey"
+]
+
 def parse_mapping(mapping_str: str) -> List[List[str]]:
     """解析映射字符串为音节列表，每个音节是组件列表"""
     syllables = []
@@ -43,13 +237,10 @@ def parse_mapping(mapping_str: str) -> List[List[str]]:
         
         # 处理每个组件
         for i, comp in enumerate(components):
-            # 开头辅音（第一个组件且在辅音列表中）
-            if i == 0 and comp in CONSONANTS:
-                new_components.append(comp + '-')  # 添加横杠
-            # 结尾辅音（最后一个组件且在辅音列表中）
-            elif i == len(components) - 1 and comp in CONSONANTS:
-                # 特殊处理n和ng
-                if comp in ['n', 'ng']:
+            if comp in CONSONANTS:
+                # 之后不再有元音的n和ng为鼻音韵尾（-n.wav），其余辅音（开头、辅音丛、VCV中间、韵尾）添加横杠
+                is_coda = i > 0 and all(rest in CONSONANTS for rest in components[i + 1:])
+                if is_coda and comp in ['n', 'ng']:
                     new_components.append(comp)
                 else:
                     new_components.append(comp + '-')
@@ -61,190 +252,2238 @@ def parse_mapping(mapping_str: str) -> List[List[str]]:
     
     return syllables
 
-def component_to_path(component: str, consonant_dirs: List[str], vowel_dir: str) -> str:
-    """将音素组件转换为完整文件路径"""
+def _normalize_member(name: str) -> str:
+    """规范化ZIP内路径（统一分隔符，Windows下不区分大小写）"""
+    return os.path.normcase(name.replace('\\', '/')).replace('\\', '/').strip('/')
+
+class _BufferReader:
+    """只读文件对象：直接在内存映射的缓冲区上读取，不预先复制整段数据"""
+
+    def __init__(self, buffer: memoryview):
+        self._buffer = buffer
+        self._pos = 0
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._buffer) if size is None or size < 0 else min(self._pos + size, len(self._buffer))
+        data = self._buffer[self._pos:end].tobytes()
+        self._pos = end
+        return data
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        base = {0: 0, 1: self._pos, 2: len(self._buffer)}[whence]
+        self._pos = max(0, min(base + offset, len(self._buffer)))
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self):
+        pass
+
+class ZipSampleSource:
+    """ZIP音源包：整个进程内只打开一次，中央目录在打开时解析一次
+
+    未压缩（stored）的成员直接从内存映射中读取；压缩成员通过zipfile解压。
+    若包内所有文件都位于同一个顶层目录（如NewStandardC.zip中的NewStandardC/），
+    查找时可以省略该目录。
+    """
+
+    def __init__(self, archive_path: str):
+        self.archive_path = archive_path
+        self._file = open(archive_path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._zip = zipfile.ZipFile(self._file)
+        self.members = {_normalize_member(info.filename): info
+                        for info in self._zip.infolist() if not info.is_dir()}
+        top_dirs = {name.split('/', 1)[0] for name in self.members}
+        self.root = top_dirs.pop() if len(top_dirs) == 1 and all('/' in name for name in self.members) else ''
+
+    def member(self, inner_path: str) -> Optional[zipfile.ZipInfo]:
+        """查找包内成员（可省略公共顶层目录），不存在时返回None"""
+        key = _normalize_member(inner_path)
+        info = self.members.get(key)
+        if info is None and self.root:
+            info = self.members.get(f"{self.root}/{key}" if key else self.root)
+        return info
+
+    def listdir(self, inner_dir: str = '') -> List[str]:
+        """列出包内目录下的文件名（可省略公共顶层目录）"""
+        key = _normalize_member(inner_dir)
+        prefixes = [key, f"{self.root}/{key}".strip('/')] if self.root else [key]
+        for prefix in prefixes:
+            names = [info.filename.replace('\\', '/').rsplit('/', 1)[-1]
+                     for name, info in self.members.items() if name.rpartition('/')[0] == prefix]
+            if names:
+                return names
+        return []
+
+    def open(self, inner_path: str):
+        """打开包内成员，返回只读文件对象"""
+        info = self.member(inner_path)
+        if info is None:
+            raise FileNotFoundError(f"压缩包 {self.archive_path} 中不存在 {inner_path}")
+        if info.compress_type == zipfile.ZIP_STORED:
+            # 跳过本地文件头（30字节固定部分 + 文件名 + 扩展字段）定位数据
+            header = self._mmap[info.header_offset:info.header_offset + 30]
+            name_len, extra_len = struct.unpack('<HH', header[26:30])
+            start = info.header_offset + 30 + name_len + extra_len
+            return _BufferReader(memoryview(self._mmap)[start:start + info.file_size])
+        return self._zip.open(info)
+
+# 已打开的ZIP音源包（每个进程每个压缩包只打开一次）
+_zip_sources = {}
+_zip_sources_lock = threading.Lock()
+
+def _reset_zip_sources():
+    """fork出的子进程不能沿用父进程打开的压缩包：读取压缩成员时zipfile先定位再读取，
+    而父子进程共享同一文件偏移，并发读取会互相干扰，因此子进程重新打开"""
+    global _zip_sources, _zip_sources_lock
+    _zip_sources = {}
+    _zip_sources_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_zip_sources)
+
+def split_archive_path(path: str) -> Optional[Tuple[ZipSampleSource, str]]:
+    """若路径位于ZIP音源包内（如 addC.zip/kr-.wav），返回（音源包, 包内路径），否则返回None"""
+    for match in re.finditer(r'\.zip(?=[\\/]|$)', path, re.IGNORECASE):
+        archive_path = path[:match.end()]
+        key = os.path.normcase(os.path.abspath(archive_path))
+        with _zip_sources_lock:
+            source = _zip_sources.get(key)
+            if source is None and os.path.isfile(archive_path):
+                source = _zip_sources[key] = ZipSampleSource(archive_path)
+        if source is not None:
+            return source, path[match.end():].lstrip('\\/')
+    return None
+
+def sample_exists(path: str) -> bool:
+    """判断音源文件是否存在（支持ZIP包内路径）"""
+    archive = split_archive_path(path)
+    if archive is not None:
+        source, inner_path = archive
+        return source.member(inner_path) is not None
+    return os.path.exists(path)
+
+def open_sample(path: str):
+    """打开音源文件用于读取：普通文件直接返回路径，ZIP包内文件返回只读文件对象"""
+    archive = split_archive_path(path)
+    if archive is not None:
+        source, inner_path = archive
+        return source.open(inner_path)
+    return path
+
+def component_filename(component: str) -> Tuple[str, bool]:
+    """返回音素组件对应的文件名，以及该文件是否位于辅音目录"""
     # 特殊处理hh音素，始终使用h-.wav
     if component == 'hh' or component == 'hh-':
-        for consonant_dir in consonant_dirs:
-            path = os.path.join(consonant_dir, "h-.wav")
-            if os.path.exists(path):
-                return path
-        return os.path.join(consonant_dirs[0], "h-.wav")
+        return "h-.wav", True
     
     if component.endswith('-'):
         # 标准辅音（如b- → b-.wav）
-        consonant = component[:-1]
-        for consonant_dir in consonant_dirs:
-            path = os.path.join(consonant_dir, f"{consonant}-.wav")
-            if os.path.exists(path):
-                return path
-        return os.path.join(consonant_dirs[0], f"{consonant}-.wav")
+        return f"{component[:-1]}-.wav", True
     elif component in ('n', 'ng'):
         # 特殊结尾辅音（如n → -n.wav）
-        for consonant_dir in consonant_dirs:
-            path = os.path.join(consonant_dir, f"-{component}.wav")
-            if os.path.exists(path):
-                return path
-        return os.path.join(consonant_dirs[0], f"-{component}.wav")
+        return f"-{component}.wav", True
     else:
         # 元音或复合元音（如ae → a.wav）
         # 使用映射表转换元音名称
         vowel_name = VOWEL_MAPPING.get(component, component)
-        return os.path.join(vowel_dir, f"{vowel_name}.wav")
+        return f"{vowel_name}.wav", False
+
+def component_to_path(component: str, consonant_dirs: List[str], vowel_dir: str,
+                      index: Optional["PhonemeIndex"] = None) -> str:
+    """将音素组件转换为完整文件路径（传入index时直接查询预先建立的索引）"""
+    if index is not None:
+        return index.resolve(component)
+    
+    filename, is_consonant = component_filename(component)
+    if not is_consonant:
+        return os.path.join(vowel_dir, filename)
+    
+    # 辅音按目录优先级查找，都不存在时指向第一个目录
+    for consonant_dir in consonant_dirs:
+        path = os.path.join(consonant_dir, filename)
+        if sample_exists(path):
+            return path
+    return os.path.join(consonant_dirs[0], filename)
 
-def read_wav(file_path: str) -> Tuple[Optional[list], Optional[str]]:
-    """读取WAV文件并验证参数，返回音频数据和错误信息"""
+def _list_wav_files(directory: str) -> List[str]:
+    """列出目录（或ZIP音源包内目录）中的WAV文件名，目录不存在时返回空列表"""
+    archive = split_archive_path(directory)
+    if archive is not None:
+        source, inner_dir = archive
+        return [name for name in source.listdir(inner_dir) if name.lower().endswith('.wav')]
     try:
-        with wave.open(file_path, 'rb') as wf:
-            # 验证参数
-            if wf.getnchannels() != CHANNELS:
-                return None, f"非单声道（当前{wf.getnchannels()}声道）"
-            if wf.getsampwidth() != SAMPLE_WIDTH:
-                return None, f"非16位（当前{wf.getsampwidth()}字节）"
-            if wf.getframerate() != SAMPLE_RATE:
-                return None, f"采样率错误（当前{wf.getframerate()}Hz）"
+        with os.scandir(directory) as entries:
+            return [entry.name for entry in entries
+                    if entry.name.lower().endswith('.wav') and entry.is_file()]
+    except OSError:
+        return []
+
+class PhonemeIndex:
+    """音素文件索引：一次扫描所有音源目录，之后解析组件路径不再访问文件系统
+
+    辅音目录按给定顺序确定优先级（如NewStandardC优先于addC），
+    被高优先级目录覆盖的同名文件记录在shadowed中。
+    """
+
+    def __init__(self, consonant_dirs: List[str], vowel_dir: str):
+        self.consonant_dirs = list(consonant_dirs)
+        self.vowel_dir = vowel_dir
+        self.consonants = {}  # 文件名 → 实际使用的路径
+        self.shadowed = {}    # 文件名 → 被覆盖的路径列表
+        for consonant_dir in self.consonant_dirs:
+            for name in _list_wav_files(consonant_dir):
+                key = os.path.normcase(name)
+                path = os.path.join(consonant_dir, name)
+                if key in self.consonants:
+                    self.shadowed.setdefault(key, []).append(path)
+                else:
+                    self.consonants[key] = path
+        self.vowels = {os.path.normcase(name) for name in _list_wav_files(vowel_dir)}
+
+    def resolve(self, component: str) -> str:
+        """将音素组件转换为文件路径（与component_to_path规则相同）"""
+        filename, is_consonant = component_filename(component)
+        if not is_consonant:
+            return os.path.join(self.vowel_dir, filename)
+        path = self.consonants.get(os.path.normcase(filename))
+        return path if path is not None else os.path.join(self.consonant_dirs[0], filename)
+
+    def exists(self, component: str) -> bool:
+        """判断组件对应的文件是否存在"""
+        filename, is_consonant = component_filename(component)
+        key = os.path.normcase(filename)
+        return key in self.consonants if is_consonant else key in self.vowels
+
+    def missing_files(self, syllables: List[List[str]]) -> List[str]:
+        """返回音节列表中缺失的文件名（去重，保持顺序）"""
+        missing = []
+        for syllable in syllables:
+            for comp in syllable:
+                if not self.exists(comp):
+                    filename = component_filename(comp)[0]
+                    if filename not in missing:
+                        missing.append(filename)
+        return missing
+
+def _read_riff(f, header_only: bool = False) -> Tuple[tuple, Optional[bytes]]:
+    """解析RIFF/WAVE文件（wave模块不支持的IEEE浮点和WAVE_FORMAT_EXTENSIBLE编码也可读取）
+
+    返回（（编码, 声道数, 位深字节数, 采样率, 帧数）, 原始数据），EXTENSIBLE按子格式归为PCM或浮点；
+    header_only为True时不读取音频数据（原始数据为None）。
+    """
+    riff = f.read(12)
+    if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+        raise ValueError("不是RIFF/WAVE文件")
+    fmt = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("缺少data块")
+        chunk_id, size = header[:4], struct.unpack('<I', header[4:])[0]
+        if chunk_id == b'data':
+            break
+        body = f.read(size + (size & 1))  # 块按偶数字节对齐
+        if chunk_id == b'fmt ':
+            if len(body) < 16:
+                raise ValueError("fmt块不完整")
+            tag, nchannels, framerate, _, block_align = struct.unpack('<HHIIH', body[:14])
+            if tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                tag = struct.unpack('<H', body[24:26])[0]
+            fmt = (tag, nchannels, framerate, block_align)
+    if fmt is None:
+        raise ValueError("缺少fmt块")
+    tag, nchannels, framerate, block_align = fmt
+    if tag not in WAVE_FORMAT_NAMES:
+        raise ValueError(f"不支持的编码（格式{tag}）")
+    if nchannels == 0 or block_align % nchannels:
+        raise ValueError(f"无效的块对齐（{block_align}字节，{nchannels}声道）")
+    sampwidth = block_align // nchannels
+    if tag == WAVE_FORMAT_IEEE_FLOAT and sampwidth not in (4, 8):
+        raise ValueError(f"不支持的浮点位深（{sampwidth * 8}位）")
+    info = (tag, nchannels, sampwidth, framerate, size // block_align)
+    if header_only:
+        return info, None
+    return info, f.read(size // block_align * block_align)
+
+def _mix_channels(values: List[int], nchannels: int) -> List[int]:
+    """返回交错采样中各帧所有声道之和"""
+    if nchannels == 1:
+        return values
+    return [sum(values[i:i + nchannels]) for i in range(0, len(values) - nchannels + 1, nchannels)]
+
+def _decode_float(data_bytes: bytes, sampwidth: int, nchannels: int) -> List[int]:
+    """将IEEE浮点字节解码为各声道之和（限制在±1.0之内，按32位整数刻度取整）"""
+    code = 'f' if sampwidth == 4 else 'd'
+    values = struct.unpack(f"<{len(data_bytes) // sampwidth}{code}", data_bytes)
+    scale = 1 << 31
+    return _mix_channels([round(max(-1.0, min(1.0, v)) * scale) for v in values], nchannels)
+
+def _decode_pcm(data_bytes: bytes, sampwidth: int, nchannels: int) -> List[int]:
+    """将PCM字节解码为各声道之和（整数，8位按16位刻度，其余保持原位深）"""
+    if sampwidth == 1:
+        values = [(b - 128) << 8 for b in data_bytes]  # 8位WAV为无符号
+    elif sampwidth == 3:
+        values = [int.from_bytes(data_bytes[i:i + 3], 'little', signed=True)
+                  for i in range(0, len(data_bytes) - 2, 3)]
+    elif sampwidth in (2, 4):
+        code = 'h' if sampwidth == 2 else 'i'
+        values = list(struct.unpack(f"<{len(data_bytes) // sampwidth}{code}", data_bytes))
+    else:
+        raise ValueError(f"不支持的位深（{sampwidth}字节）")
+    return _mix_channels(values, nchannels)
+
+def _pcm_scale(sampwidth: int) -> int:
+    """返回解码值到16位刻度的缩放倍数"""
+    return 1 << (8 * (sampwidth - 2)) if sampwidth > 2 else 1
+
+def _resample_ratio(framerate: int) -> Tuple[int, int]:
+    """返回重采样到SAMPLE_RATE的（插值倍数L, 抽取倍数M）"""
+    g = math.gcd(SAMPLE_RATE, framerate)
+    return SAMPLE_RATE // g, framerate // g
+
+def converted_length(nframes: int, framerate: int) -> int:
+    """返回nframes帧采样率为framerate的音频转换后的采样数"""
+    up, down = _resample_ratio(framerate)
+    return (nframes * up + down - 1) // down
+
+_resample_filters = {}
+
+def _resample_filter(up: int, down: int) -> Tuple[int, List[List[int]]]:
+    """设计多相重采样滤波器（Blackman窗sinc低通，定点系数），返回（中心延迟, 各相位的系数）
+
+    截止频率取原采样率和目标采样率中较低者的奈奎斯特频率。系数在纯Python中计算并量化为整数，
+    列表实现和numpy实现使用相同的系数和整数累加，转换结果逐字节相同。
+    """
+    key = (up, down)
+    if key not in _resample_filters:
+        step = max(up, down)
+        center = RESAMPLE_ZERO_CROSSINGS * step
+        taps = 2 * center + 1
+        scale = 1 << RESAMPLE_COEF_BITS
+        coefs = []
+        for j in range(taps):
+            x = (j - center) / step
+            sinc = 1.0 if x == 0 else math.sin(math.pi * x) / (math.pi * x)
+            window = (0.42 - 0.5 * math.cos(2 * math.pi * j / (taps - 1))
+                      + 0.08 * math.cos(4 * math.pi * j / (taps - 1)))
+            coefs.append(round(up / step * sinc * window * scale))
+        width = (taps + up - 1) // up
+        phases = [coefs[phase::up] + [0] * (width - len(coefs[phase::up])) for phase in range(up)]
+        _resample_filters[key] = (center, phases)
+    return _resample_filters[key]
+
+def _round_div(values, divisor: int):
+    """整数除法并四舍五入（半数向正无穷取整，整数和numpy数组均适用）"""
+    return (2 * values + divisor) // (2 * divisor)
+
+def resample(samples: List[int], framerate: int, divisor: int = 1) -> List[int]:
+    """多相重采样到SAMPLE_RATE，结果除以divisor并四舍五入后限制在16位范围内"""
+    up, down = _resample_ratio(framerate)
+    center, phases = _resample_filter(up, down)
+    divisor <<= RESAMPLE_COEF_BITS
+    count = len(samples)
+    result = []
+    for n in range(converted_length(count, framerate)):
+        t = n * down + center
+        base = t // up
+        coefs = phases[t % up]
+        # 只累加落在输入范围内的采样（k越大对应越早的输入采样）
+        k_start = max(0, base - count + 1)
+        k_end = min(len(coefs), base + 1)
+        acc = 0
+        for k in range(k_start, k_end):
+            acc += coefs[k] * samples[base - k]
+        result.append(max(-32768, min(32767, _round_div(acc, divisor))))
+    return result
+
+def resample_np(samples: "np.ndarray", framerate: int, divisor: int = 1, block: int = 4096) -> "np.ndarray":
+    """resample的numpy实现（分块向量化，整数累加，结果与列表实现相同）"""
+    up, down = _resample_ratio(framerate)
+    center, phases = _resample_filter(up, down)
+    divisor <<= RESAMPLE_COEF_BITS
+    coefs = np.array(phases, dtype=np.int64)
+    width = coefs.shape[1]
+    pad = width + center // up + 1
+    padded = np.concatenate((np.zeros(width, dtype=np.int64), np.asarray(samples, dtype=np.int64),
+                             np.zeros(pad, dtype=np.int64)))
+    offsets = np.arange(width)
+    total = converted_length(len(samples), framerate)
+    result = np.empty(total, dtype=np.int16)
+    for start in range(0, total, block):
+        t = np.arange(start, min(start + block, total), dtype=np.int64) * down + center
+        windows = padded[(t // up + width)[:, None] - offsets[None, :]]
+        acc = (windows * coefs[t % up]).sum(axis=1)
+        result[start:start + len(t)] = np.clip(_round_div(acc, divisor), -32768, 32767)
+    return result
+
+class SampleConverter:
+    """格式转换：将非单声道、非16位或非44.1kHz的音源转换为标准格式
+
+    依次进行声道混合（取平均）、位深转换和多相重采样。转换结果以源文件内容的SHA-1为键
+    缓存在cache_dir中（cache_dir为None时不缓存），之后的运行直接读取缓存，不再转换。
+    use_numpy为True时使用numpy实现（结果与纯Python实现相同）。
+    """
+
+    def __init__(self, cache_dir: Optional[str] = CONVERT_CACHE_DIR, use_numpy: bool = False):
+        self.cache_dir = cache_dir
+        self.use_numpy = use_numpy and np is not None
+
+    def cache_path(self, data: bytes) -> Optional[str]:
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.sha1(data).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}-{RESAMPLE_ZERO_CROSSINGS}-{RESAMPLE_COEF_BITS}.wav")
+
+    def _store(self, cache_path: str, converted: bytes):
+        """写入转换缓存（先写临时文件再替换，多个进程同时转换同一文件时互不影响；写入失败时只是不缓存）"""
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with wave.open(tmp_path, 'wb') as wf:
+                wf.setnchannels(CHANNELS)
+                wf.setsampwidth(SAMPLE_WIDTH)
+                wf.setframerate(SAMPLE_RATE)
+                wf.writeframes(converted)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def convert(self, file_path: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """返回转换后的16位单声道PCM字节数据和错误信息"""
+        try:
+            source = open_sample(file_path)
+            if isinstance(source, str):
+                with open(source, 'rb') as f:
+                    data = f.read()
+            else:
+                data = source.read()
+            cache_path = self.cache_path(data)
+            if cache_path is not None and os.path.exists(cache_path):
+                with wave.open(cache_path, 'rb') as wf:
+                    return wf.readframes(wf.getnframes()), None
             
-            # 读取音频数据并转换为整数列表
-            nframes = wf.getnframes()
-            data_bytes = wf.readframes(nframes)
-            # 16位PCM小端格式
-            data = list(struct.unpack(f"<{nframes}h", data_bytes))
-            return data, None
+            (tag, nchannels, sampwidth, framerate, nframes), raw = _read_riff(io.BytesIO(data))
+            if len(raw) != nframes * nchannels * sampwidth:
+                return None, f"读取失败: 数据不完整（应为{nframes}帧）"
+            if tag == WAVE_FORMAT_IEEE_FLOAT:
+                # 浮点解码为32位整数刻度
+                samples = _decode_float(raw, sampwidth, nchannels)
+                divisor = nchannels * _pcm_scale(4)
+            else:
+                samples = _decode_pcm(raw, sampwidth, nchannels)
+                divisor = nchannels * _pcm_scale(sampwidth)
+            if framerate != SAMPLE_RATE:
+                if self.use_numpy:
+                    converted = resample_np(np.array(samples, dtype=np.int64), framerate, divisor).astype('<i2').tobytes()
+                else:
+                    converted = struct.pack(f"<{converted_length(nframes, framerate)}h",
+                                            *resample(samples, framerate, divisor))
+            else:
+                converted = struct.pack(f"<{len(samples)}h",
+                                        *(max(-32768, min(32767, _round_div(v, divisor))) for v in samples))
+            
+            if cache_path is not None:
+                self._store(cache_path, converted)
+            return converted, None
+        except Exception as e:
+            return None, f"格式转换失败: {str(e)}"
+
+def _format_error(nchannels: int, sampwidth: int, framerate: int,
+                  tag: int = WAVE_FORMAT_PCM) -> Optional[str]:
+    """检查WAV参数是否为单声道、16位PCM、44.1kHz，返回错误信息"""
+    if tag != WAVE_FORMAT_PCM:
+        return f"非PCM编码（当前{WAVE_FORMAT_NAMES[tag]}）"
+    if nchannels != CHANNELS:
+        return f"非单声道（当前{nchannels}声道）"
+    if sampwidth != SAMPLE_WIDTH:
+        return f"非16位（当前{sampwidth}字节）"
+    if framerate != SAMPLE_RATE:
+        return f"采样率错误（当前{framerate}Hz）"
+    return None
+
+def _read_wav_frames(file_path: str, converter: Optional[SampleConverter] = None) -> Tuple[Optional[bytes], Optional[str]]:
+    """读取WAV文件并验证参数，返回原始16位PCM字节数据和错误信息
+
+    传入converter时，格式不符的文件经转换后返回，而不是报错。
+    wave模块无法打开的文件（IEEE浮点、WAVE_FORMAT_EXTENSIBLE）由_read_riff解析。
+    """
+    try:
+        try:
+            with wave.open(open_sample(file_path), 'rb') as wf:
+                params = (wf.getnchannels(), wf.getsampwidth(), wf.getframerate())
+                nframes = wf.getnframes()
+                data_bytes = None if _format_error(*params) else wf.readframes(nframes)
+                tag = WAVE_FORMAT_PCM
+        except wave.Error:
+            with closing(_open_binary(file_path)) as f:
+                (tag, *params, nframes), data_bytes = _read_riff(f)
+        
+        # 验证参数
+        error = _format_error(*params, tag)
+        if error:
+            if converter is not None:
+                return converter.convert(file_path)
+            return None, error
+        if len(data_bytes) != nframes * SAMPLE_WIDTH:
+            return None, f"读取失败: 数据不完整（应为{nframes}帧）"
+        return data_bytes, None
             
     except Exception as e:
         return None, f"读取失败: {str(e)}"
 
-def write_wav(file_path: str, data: list) -> Optional[str]:
-    """将音频数据写入WAV文件，返回错误信息"""
+def read_wav_np(file_path: str, converter: Optional[SampleConverter] = None) -> Tuple[Optional["np.ndarray"], Optional[str]]:
+    """读取WAV文件为只读int16数组（直接引用读取的字节，不复制），返回音频数据和错误信息"""
+    data_bytes, error = _read_wav_frames(file_path, converter)
+    if error:
+        return None, error
+    return np.frombuffer(data_bytes, dtype='<i2'), None
+
+def _concat(*parts: Sequence[int]) -> list:
+    """将多段音频数据拼接为新列表（兼容只读的元组缓存）"""
+    result = []
+    for part in parts:
+        result.extend(part)
+    return result
+
+def _open_binary(file_path: str):
+    """以二进制只读方式打开音源文件（支持ZIP包内路径）"""
+    source = open_sample(file_path)
+    return open(source, 'rb') if isinstance(source, str) else source
+
+def read_wav_info(file_path: str) -> Tuple[Optional[tuple], Optional[str]]:
+    """只读取WAV文件头，返回（声道数, 位深字节数, 采样率, 帧数, 编码）和错误信息"""
     try:
-        with wave.open(file_path, 'wb') as wf:
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(SAMPLE_WIDTH)
-            wf.setframerate(SAMPLE_RATE)
-            wf.setnframes(len(data))
-            # 将整数列表转换为字节数据
-            wf.writeframes(struct.pack(f"<{len(data)}h", *data))
-        return None
+        try:
+            with wave.open(open_sample(file_path), 'rb') as wf:
+                return (wf.getnchannels(), wf.getsampwidth(), wf.getframerate(), wf.getnframes(),
+                        WAVE_FORMAT_PCM), None
+        except wave.Error:
+            with closing(_open_binary(file_path)) as f:
+                (tag, nchannels, sampwidth, framerate, nframes), _ = _read_riff(f, header_only=True)
+            return (nchannels, sampwidth, framerate, nframes, tag), None
     except Exception as e:
-        return f"写入失败: {str(e)}"
+        return None, f"读取失败: {str(e)}"
+
+def read_wav_header(file_path: str, convert: bool = False) -> Tuple[Optional[int], Optional[str]]:
+    """只读取WAV文件头并验证参数，返回帧数和错误信息
+
+    convert为True时格式不符不视为错误，返回转换后的采样数（见SampleConverter）。
+    """
+    info, error = read_wav_info(file_path)
+    if error:
+        return None, error
+    nchannels, sampwidth, framerate, nframes, tag = info
+    if not convert:
+        error = _format_error(nchannels, sampwidth, framerate, tag)
+        if error:
+            return None, error
+    return converted_length(nframes, framerate), None
+
+def read_wav_shared(file_path: str, converter: Optional[SampleConverter] = None) -> Tuple[Optional[tuple], Optional[str]]:
+    """读取WAV文件为只读元组，供样本缓存在多个音节间共享"""
+    data_bytes, error = _read_wav_frames(file_path, converter)
+    if error:
+        return None, error
+    return struct.unpack(f"<{len(data_bytes) // SAMPLE_WIDTH}h", data_bytes), None
+
+def _length(data: Optional[Sequence[int]]) -> int:
+    """返回音频数据的采样数（None视为0）"""
+    return 0 if data is None else len(data)
+
+class LRUCache:
+    """按内存占用（字节）限制大小的LRU缓存（线程安全），记录命中、未命中和淘汰次数
+
+    条目大小为采样数乘以sample_bytes（每个采样的内存占用，取决于音频后端，见ListBackend.sample_bytes）。
+    """
+
+    label = "缓存"
+
+    def __init__(self, max_bytes: int, sample_bytes: int = SAMPLE_WIDTH):
+        self.max_bytes = max_bytes
+        self.sample_bytes = sample_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # 键 → (值, 字节数)
+        self._total_bytes = 0
+        self._lock = threading.Lock()  # 线程池渲染时多个线程共享同一缓存
+
+    def get(self, key, count: bool = True):
+        """查找缓存，未命中时返回None（count为False时不计入命中统计）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += count
+                return None
+            self.hits += count
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, samples: int):
+        """加入缓存并按需淘汰，已存在时保留先加入的值，返回缓存中的值"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            nbytes = samples * self.sample_bytes
+            self._entries[key] = (value, nbytes)
+            self._total_bytes += nbytes
+            # 淘汰最久未使用的条目，直到总字节数回到上限以内（至少保留最新的一个）
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_bytes
+                self.evictions += 1
+            return value
+
+    def stats(self) -> str:
+        """返回命中统计信息"""
+        return (f"{self.label}: 命中 {self.hits} 次, 未命中 {self.misses} 次, "
+                f"淘汰 {self.evictions} 次, 当前 {len(self._entries)} 项（约 {self._total_bytes / 1024 / 1024:.1f} MiB）")
+
+class SampleBank(LRUCache):
+    """音源样本缓存：每个源文件只读取、校验一次，供所有音节共享只读数据
+
+    缓存按内存占用限制大小，超出上限时淘汰最久未使用的文件。
+    """
+
+    label = "样本缓存"
+
+    def __init__(self, max_bytes: int = SAMPLE_BANK_MAX_BYTES, loader=None, sample_bytes: int = SAMPLE_WIDTH):
+        super().__init__(max_bytes, sample_bytes)
+        self.loader = loader or read_wav_shared
+        self._prefetched = set()  # 预读载入、尚未被load取用的键
+
+    def load(self, file_path: str) -> Tuple[Optional[Sequence[int]], Optional[str]]:
+        """获取文件的只读音频数据，返回音频数据和错误信息"""
+        key = os.path.normcase(os.path.abspath(file_path))
+        with self._lock:
+            prefetched = key in self._prefetched
+            self._prefetched.discard(key)
+        # 预读时已计为未命中，第一次取用不再计为命中
+        entry = self.get(key, count=not prefetched)
+        if entry is not None:
+            return entry
+        if prefetched:
+            with self._lock:
+                self.misses += 1
+        # 在锁外读取文件，错误结果同样缓存，避免重复校验同一个坏文件
+        entry = self.loader(file_path)
+        return self.put(key, entry, _length(entry[0]))
+
+    def prefetch(self, file_path: str):
+        """预先载入文件（流水线预读用），命中统计与直接调用load时相同
+
+        已缓存时只更新使用顺序，不计入统计；未缓存时读取并计为一次未命中。
+        """
+        key = os.path.normcase(os.path.abspath(file_path))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self.misses += 1
+            self._prefetched.add(key)
+        entry = self.loader(file_path)
+        self.put(key, entry, _length(entry[0]))
+
+class WavStreamWriter:
+    """流式WAV写入器：音频分段到达即写入文件，关闭时补全文件头
+
+    先写入临时文件，成功关闭后再替换为目标文件；中途出错时调用abort删除临时文件，
+    不会留下不完整的输出。
+    """
+
+    def __init__(self, file_path: str, encode, profiler: Optional["Profiler"] = None):
+        self.file_path = file_path
+        self.encode = encode
+        self.profiler = profiler
+        self.frames = 0
+        self._tmp_path = file_path + ".part"
+        self._wf = wave.open(self._tmp_path, 'wb')
+        self._wf.setnchannels(CHANNELS)
+        self._wf.setsampwidth(SAMPLE_WIDTH)
+        self._wf.setframerate(SAMPLE_RATE)
+
+    def write(self, data: Sequence[int]):
+        """写入一段音频"""
+        if len(data):
+            start = time.perf_counter()
+            # writeframesraw不会每次回写文件头，帧数在关闭时统一补全
+            self._wf.writeframesraw(self.encode(data))
+            self.frames += len(data)
+            if self.profiler is not None:
+                self.profiler.add('write_wav', time.perf_counter() - start, len(data), len(data) * SAMPLE_WIDTH)
+
+    def close(self):
+        """补全文件头并替换为目标文件"""
+        start = time.perf_counter()
+        self._wf.close()
+        os.replace(self._tmp_path, self.file_path)
+        if self.profiler is not None:
+            self.profiler.add('write_wav', time.perf_counter() - start)
+
+    def abort(self):
+        """放弃写入并删除临时文件"""
+        try:
+            self._wf.close()
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
 
 def generate_silence(duration: float) -> list:
     """生成指定时长的静音数据"""
     samples = int(duration * SAMPLE_RATE)
     return [0] * samples
 
-def cross_fade(data1: list, data2: list, fade_samples: int) -> list:
+@lru_cache(maxsize=FADE_TABLE_CACHE_SIZE)
+def fade_table(fade_len: int, curve: str = 'linear') -> Tuple[Tuple[float, ...], Tuple[float, ...]]:
+    """返回（淡出系数, 淡入系数），按长度和曲线缓存，相同长度的淡化不再重复计算"""
+    if curve == 'equal_power':
+        fade_out = tuple(math.cos(i / fade_len * math.pi / 2) for i in range(fade_len))
+        fade_in = tuple(math.sin(i / fade_len * math.pi / 2) for i in range(fade_len))
+    else:
+        fade_out = tuple(1.0 - i / fade_len for i in range(fade_len))  # 1.0 → 0.0
+        fade_in = tuple(i / fade_len for i in range(fade_len))          # 0.0 → 1.0
+    return fade_out, fade_in
+
+@lru_cache(maxsize=FADE_TABLE_CACHE_SIZE)
+def fade_table_np(fade_len: int, curve: str = 'linear') -> Tuple["np.ndarray", "np.ndarray"]:
+    """fade_table的numpy版本（只读float64数组）"""
+    # 系数与混合均使用float64计算，保证线性淡化与列表版本的舍入完全相同
+    ramp = np.arange(fade_len) / fade_len
+    if curve == 'equal_power':
+        fade_out = np.cos(ramp * (math.pi / 2))
+        fade_in = np.sin(ramp * (math.pi / 2))
+    else:
+        fade_out = 1.0 - ramp
+        fade_in = ramp
+    fade_out.setflags(write=False)
+    fade_in.setflags(write=False)
+    return fade_out, fade_in
+
+def mix_into(buffer: list, pos: int, data: Sequence[int], fade_len: int, curve: str = 'linear'):
+    """将buffer中从pos起的fade_len个采样与data开头交叉淡化（原地修改）"""
+    if fade_len <= 0:
+        return
+    fade_out, fade_in = fade_table(fade_len, curve)
+    for i in range(fade_len):
+        # 按系数交叉淡化
+        sample = int(buffer[pos + i] * fade_out[i] + data[i] * fade_in[i])
+        # 限制在16位范围内
+        if sample > 32767: sample = 32767
+        elif sample < -32768: sample = -32768
+        buffer[pos + i] = sample
+
+def mix_into_np(buffer: "np.ndarray", pos: int, data: "np.ndarray", fade_len: int, curve: str = 'linear'):
+    """mix_into的numpy版本（线性淡化结果与列表版本逐字节一致）"""
+    if fade_len <= 0:
+        return
+    fade_out, fade_in = fade_table_np(fade_len, curve)
+    mixed = buffer[pos:pos + fade_len] * fade_out + data[:fade_len] * fade_in
+    # 向零取整后限制在16位范围内（与int()行为一致）
+    buffer[pos:pos + fade_len] = np.clip(np.trunc(mixed), -32768, 32767)
+
+def cross_fade(data1: Sequence[int], data2: Sequence[int], fade_samples: int, curve: str = 'linear') -> list:
     """交叉淡化两个音频数据"""
     if fade_samples <= 0:
-        return data1 + data2
+        return _concat(data1, data2)
     
     # 确保淡化长度不超过任一音频长度
     fade_len = min(fade_samples, len(data1), len(data2))
     
-    # 计算淡入淡出系数
-    fade_out = [1.0 - i / fade_len for i in range(fade_len)]  # 1.0 → 0.0
-    fade_in = [i / fade_len for i in range(fade_len)]          # 0.0 → 1.0
+    # 拼接结果：data1的非重叠部分 + 混合部分 + data2的非重叠部分
+    result = _concat(data1, data2[fade_len:])
+    mix_into(result, len(data1) - fade_len, data2, fade_len, curve)
+    return result
+
+def cross_fade_np(data1: "np.ndarray", data2: "np.ndarray", fade_samples: int, curve: str = 'linear') -> "np.ndarray":
+    """交叉淡化两个int16数组（向量化版本，线性淡化结果与cross_fade逐字节一致）"""
+    if fade_samples <= 0:
+        return np.concatenate((data1, data2)).astype(np.int16, copy=False)
     
-    # 混合重叠部分
-    mixed = []
-    for i in range(fade_len):
-        # 线性交叉淡化
-        sample = int(data1[-(fade_len - i)] * fade_out[i] + 
-                     data2[i] * fade_in[i])
-        # 限制在16位范围内
-        if sample > 32767: sample = 32767
-        elif sample < -32768: sample = -32768
-        mixed.append(sample)
+    fade_len = min(fade_samples, len(data1), len(data2))
+    result = np.concatenate((data1, data2[fade_len:])).astype(np.int16, copy=False)
+    mix_into_np(result, len(data1) - fade_len, data2, fade_len, curve)
+    return result
+
+class ListBackend:
+    """纯Python整数列表音频后端（默认，无额外依赖）"""
+    name = 'list'
+
+    # 每个采样的内存占用（字节）：元组/列表中的指针加上整数对象
+    sample_bytes = 40
+
+    def __init__(self, curve: str = FADE_CURVE, converter: Optional[SampleConverter] = None):
+        self.curve = curve
+        self.converter = converter
+
+    def load(self, file_path: str):
+        return read_wav_shared(file_path, self.converter)
+
+    silence = staticmethod(generate_silence)
+    concat = staticmethod(_concat)
+
+    @staticmethod
+    def encode(data: Sequence[int]) -> bytes:
+        return struct.pack(f"<{len(data)}h", *data)
+
+    @staticmethod
+    def zeros(samples: int) -> list:
+        return [0] * samples
+
+    @staticmethod
+    def scale(data: Sequence[int], gain: float) -> tuple:
+        return tuple(max(-32768, min(32767, round(v * gain))) for v in data)
+
+    @staticmethod
+    def levels(data: Sequence[int]) -> Tuple[int, int, int]:
+        peak = 0
+        squares = 0
+        clipped = 0
+        for v in data:
+            magnitude = -v if v < 0 else v
+            if magnitude > peak:
+                peak = magnitude
+            if magnitude >= 32767:
+                clipped += 1
+            squares += v * v
+        return peak, squares, clipped
+
+    def cross_fade(self, data1, data2, fade_samples: int):
+        return cross_fade(data1, data2, fade_samples, self.curve)
+
+    def mix_into(self, buffer: list, pos: int, data, fade_samples: int):
+        mix_into(buffer, pos, data, fade_samples, self.curve)
+
+class NumpyBackend:
+    """NumPy数组音频后端：读取零拷贝，淡化向量化，写入直接使用数组字节"""
+    name = 'numpy'
+    sample_bytes = SAMPLE_WIDTH
+
+    def __init__(self, curve: str = FADE_CURVE, converter: Optional[SampleConverter] = None):
+        if np is None:
+            raise RuntimeError("numpy后端需要安装numpy（pip install numpy）")
+        self.curve = curve
+        self.converter = converter
+
+    def load(self, file_path: str):
+        return read_wav_np(file_path, self.converter)
+
+    @staticmethod
+    def silence(duration: float) -> "np.ndarray":
+        return np.zeros(int(duration * SAMPLE_RATE), dtype=np.int16)
+
+    @staticmethod
+    def concat(*parts) -> "np.ndarray":
+        if not parts:
+            return np.zeros(0, dtype=np.int16)
+        return np.concatenate([np.asarray(part, dtype=np.int16) for part in parts])
+
+    @staticmethod
+    def encode(data) -> bytes:
+        return np.asarray(data, dtype='<i2').tobytes()
+
+    @staticmethod
+    def zeros(samples: int) -> "np.ndarray":
+        return np.zeros(samples, dtype=np.int16)
+
+    @staticmethod
+    def scale(data, gain: float) -> "np.ndarray":
+        # np.rint与round()同为四舍六入五成双，结果与列表后端相同
+        return np.clip(np.rint(np.asarray(data) * gain), -32768, 32767).astype(np.int16)
+
+    @staticmethod
+    def levels(data) -> Tuple[int, int, int]:
+        magnitude = np.abs(np.asarray(data, dtype=np.int64))
+        if not len(magnitude):
+            return 0, 0, 0
+        return int(magnitude.max()), int(np.dot(magnitude, magnitude)), int(np.count_nonzero(magnitude >= 32767))
+
+    def cross_fade(self, data1, data2, fade_samples: int):
+        return cross_fade_np(data1, data2, fade_samples, self.curve)
+
+    def mix_into(self, buffer, pos: int, data, fade_samples: int):
+        mix_into_np(buffer, pos, data, fade_samples, self.curve)
+
+AUDIO_BACKENDS = {'list': ListBackend, 'numpy': NumpyBackend}
+
+def get_backend(name: str = 'list', curve: str = FADE_CURVE, converter: Optional[SampleConverter] = None):
+    """按名称创建音频后端（传入converter时读取格式不符的音源会自动转换）"""
+    if name not in AUDIO_BACKENDS:
+        raise ValueError(f"未知的音频后端: {name}（可选: {', '.join(AUDIO_BACKENDS)}）")
+    if curve not in ('linear', 'equal_power'):
+        raise ValueError(f"未知的淡化曲线: {curve}")
+    return AUDIO_BACKENDS[name](curve, converter)
+
+PROFILE_STAGES = ('read_wav', 'cross_fade', 'syllable', 'write_wav')
+
+class Profiler:
+    """渲染性能统计：按阶段累计每条录音的耗时、采样数和字节数
+
+    统计记录按线程保存，线程池渲染时每条录音的数据互不混淆。
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @contextmanager
+    def line(self, record: Optional[dict] = None):
+        """统计一条录音的渲染，产出该录音的统计记录
+
+        传入record时继续累计到已有的记录（流水线模式下同一条录音的各阶段在不同线程中进行）。
+        """
+        if record is None:
+            record = {'seconds': 0.0, 'stages': {}}
+        self._local.record = record
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] += time.perf_counter() - start
+            self._local.record = None
+
+    def add(self, stage: str, seconds: float, samples: int = 0, nbytes: int = 0):
+        """累计一次阶段调用：[调用次数, 耗时, 采样数, 字节数]"""
+        record = getattr(self._local, 'record', None)
+        if record is None:
+            return
+        entry = record['stages'].setdefault(stage, [0, 0.0, 0, 0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] += samples
+        entry[3] += nbytes
+
+class ProfiledBackend:
+    """音频后端包装器：为读取和交叉淡化计时（音节拼接的整体耗时由Renderer记录为syllable阶段）"""
+
+    def __init__(self, backend, profiler: Profiler):
+        self._backend = backend
+        self.profiler = profiler
+        self.name = backend.name
+        self.curve = backend.curve
+        self.sample_bytes = backend.sample_bytes
+        self.silence = backend.silence
+        self.encode = backend.encode
+        self.zeros = backend.zeros
+        self.concat = backend.concat
+        self.scale = backend.scale
+        self.levels = backend.levels
+
+    def load(self, file_path: str):
+        start = time.perf_counter()
+        data, error = self._backend.load(file_path)
+        samples = _length(data)
+        self.profiler.add('read_wav', time.perf_counter() - start, samples, samples * SAMPLE_WIDTH)
+        return data, error
+
+    def cross_fade(self, data1, data2, fade_samples: int):
+        start = time.perf_counter()
+        result = self._backend.cross_fade(data1, data2, fade_samples)
+        self.profiler.add('cross_fade', time.perf_counter() - start, max(0, min(fade_samples, len(data1), len(data2))))
+        return result
+
+    def mix_into(self, buffer, pos: int, data, fade_samples: int):
+        start = time.perf_counter()
+        self._backend.mix_into(buffer, pos, data, fade_samples)
+        self.profiler.add('cross_fade', time.perf_counter() - start, max(0, fade_samples))
+
+def level_gain(mode: str, level_db: float, peak: int, squares: int, count: int,
+               max_gain_db: Optional[float] = None) -> float:
+    """计算把音频调整到目标电平（dBFS）的增益
+
+    mode为peak时按峰值、为rms时按均方根计算；rms模式的增益同时受峰值余量限制，不会引入削波。
+    静音返回1.0；传入max_gain_db时限制最大提升。
+    """
+    if peak == 0 or count == 0:
+        return 1.0
+    target = 32767 * 10 ** (level_db / 20)
+    if mode == 'peak':
+        gain = target / peak
+    else:
+        gain = min(target / math.sqrt(squares / count), 32767 / peak)
+    if max_gain_db is not None:
+        gain = min(gain, 10 ** (max_gain_db / 20))
+    return gain
+
+class SourceGains:
+    """音源增益匹配：读取音源时把每个文件的电平调整到同一目标值，统一不同目录音源的音量
+
+    增益按源文件（绝对路径）计算，连同源文件的快速校验标记（见_source_stamp）保存在cache_path（JSON）中，
+    源文件未变化时之后的运行直接使用缓存的增益，不再测量电平。缓存文件是整次运行共用的一个位置，
+    按匹配方式和目标电平分节保存，不同设置、不同音源目录和不同输出目录的任务互不覆盖。
+    工作进程中测量的增益通过take_new取出、随渲染结果传回主进程（见LineResult.gains），由主进程update后统一save。
+    """
+
+    def __init__(self, mode: str, level_db: float, cache_path: Optional[str] = None):
+        self.mode = mode
+        self.level_db = level_db
+        self.cache_path = cache_path
+        self.section = f"{mode}:{level_db}"  # 缓存文件中的节名
+        self._gains = {}  # 绝对路径 → [校验标记, 增益]
+        self._new = {}  # 本进程测量或从工作进程收到、尚未保存的条目
+        self._lock = threading.Lock()
+        if cache_path is not None:
+            self._gains = dict(self._read().get(self.section, {}))
+
+    def _read(self) -> dict:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return stored if isinstance(stored, dict) else {}
+
+    def gain(self, file_path: str, data: Sequence[int], backend) -> float:
+        """返回文件的增益（缓存中没有或源文件已变化时根据data测量）"""
+        key = os.path.abspath(file_path)
+        stamp = _source_stamp(file_path)
+        with self._lock:
+            entry = self._gains.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        peak, squares, _ = backend.levels(data)
+        gain = level_gain(self.mode, self.level_db, peak, squares, len(data), SOURCE_MAX_GAIN_DB)
+        with self._lock:
+            self._gains[key] = self._new[key] = [stamp, gain]
+        return gain
+
+    def take_new(self) -> dict:
+        """取出尚未保存的条目（工作进程调用，随渲染结果传回主进程）"""
+        with self._lock:
+            new, self._new = self._new, {}
+        return new
+
+    def update(self, entries: dict):
+        """合并工作进程测量的条目"""
+        with self._lock:
+            self._gains.update(entries)
+            self._new.update(entries)
+
+    def save(self):
+        """把新条目合并进缓存文件的对应节（重新读取文件，保留其他设置的节和其他运行写入的条目；先写临时文件再替换）"""
+        with self._lock:
+            if self.cache_path is None or not self._new:
+                return
+            new, self._new = self._new, {}
+        stored = self._read()
+        section = stored.get(self.section)
+        stored[self.section] = dict(section if isinstance(section, dict) else {}, **new)
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(stored, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+class Splice(NamedTuple):
+    """音节内的一次拼接：已拼接音频从cut处起与下一个组件的前fade个采样交叉淡化，
+    随后接上该组件的[fade:end]部分（cut之后原有的其余音频被丢弃）；rule为拼接规则（见join_rule）"""
+    cut: int
+    fade: int
+    end: int
+    rule: str = 'onset'
+
+class SyllableRender(NamedTuple):
+    """音节渲染结果：音频分段、各组件采样数和拼接计划"""
+    chunks: List[Sequence[int]]
+    lengths: List[int]
+    splices: List[Splice]
+
+    @property
+    def length(self) -> int:
+        return sum(len(chunk) for chunk in self.chunks)
+
+class SyllableCache(LRUCache):
+    """音节渲染缓存：同一次运行中，组件文件相同的音节只拼接一次，在各录音之间复用
+
+    键为音节组件和解析后的文件路径；时间参数和淡化曲线在一次运行中固定，
+    由持有缓存的渲染器保证。缓存的分段为只读共享数据。
+    """
+
+    label = "音节缓存"
+
+    def __init__(self, max_bytes: int = SYLLABLE_CACHE_MAX_BYTES, sample_bytes: int = SAMPLE_WIDTH):
+        super().__init__(max_bytes, sample_bytes)
+
+def join_rule(syllable: Sequence[str], i: int) -> str:
+    """返回音节中第i个组件与前一组件的拼接规则
+
+    onset：辅音（或辅音丛中的辅音）进入后一组件，辅音55%处开始重叠
+    vowel：元音之间（VV）短交叉淡化
+    nasal：元音后的n/ng韵尾，只保留淡化部分
+    coda：元音后的其他辅音（包括VCV中间的辅音和韵尾辅音丛），保留辅音尾部
+    """
+    is_consonant = component_filename(syllable[i])[1]
+    prev_is_consonant = component_filename(syllable[i - 1])[1]
+    if not is_consonant:
+        return 'onset' if prev_is_consonant else 'vowel'
+    if prev_is_consonant and any(not component_filename(comp)[1] for comp in syllable[i + 1:]):
+        return 'onset'  # 辅音丛（如 s-t-r-a）
+    return 'nasal' if syllable[i] in ('n', 'ng') else 'coda'
+
+def wanted_fade(rule: str, span: int) -> int:
+    """返回拼接规则期望的交叉淡化长度（span为前一组件在已拼接音频中的长度），未受组件长度限制"""
+    if rule == 'onset':
+        return span - int(span * CONSONANT_OVERLAP_PERCENT)
+    if rule == 'vowel':
+        return int(CROSS_FADE_VOWEL * SAMPLE_RATE)
+    return int(span * END_CONSONANT_FADE_PERCENT)
+
+def tail_fade_limit(rule: str, length: int) -> int:
+    """返回韵尾（nasal/coda）组件自身时长允许的最大交叉淡化长度"""
+    if rule == 'nasal':
+        return length
+    return int(length * (1 - END_CONSONANT_RETAIN_PERCENT))
+
+def plan_syllable(syllable: List[str], lengths: List[int]) -> Tuple[Optional[List[Splice]], Optional[str]]:
+    """根据各组件的采样数计算音节的拼接计划，返回拼接列表和错误信息
+
+    组件数量不限（辅音丛+元音+多个韵尾辅音、VCV等），每次拼接按join_rule的规则计算，
+    淡化长度都被min(...)限制在相邻两段音频的长度之内。
+    """
+    if not syllable:
+        return None, f"不支持的组件数量: {len(syllable)}"
     
-    # 拼接结果：data1的非重叠部分 + 混合部分 + data2的非重叠部分
-    return data1[:-fade_len] + mixed + data2[fade_len:]
+    splices = []
+    start = 0             # 前一组件在已拼接音频中的起点
+    span = lengths[0]     # 前一组件在已拼接音频中的长度
+    total = lengths[0]    # 已拼接音频的长度
+    for i in range(1, len(syllable)):
+        rule = join_rule(syllable, i)
+        length = lengths[i]
+        fade = wanted_fade(rule, span)
+        if rule == 'onset':
+            # 辅音55%之前保留，其后与下一组件交叉淡化，随后接上下一组件其余部分
+            cut = start + int(span * CONSONANT_OVERLAP_PERCENT)
+            fade = min(total - cut, length)
+            end = length
+        elif rule == 'vowel':
+            fade = min(fade, span, length)
+            cut = total - fade
+            end = length
+        elif rule == 'nasal':
+            # n/ng韵尾：使用元音时长的30%进行交叉淡化，只保留淡化部分
+            fade = min(fade, total, tail_fade_limit(rule, length))
+            cut = total - fade
+            end = fade
+        else:
+            # 普通韵尾：辅音前90%与元音交叉淡化，保留最后10%
+            fade = min(fade, total, tail_fade_limit(rule, length))
+            cut = total - fade
+            end = length
+        splices.append(Splice(cut, fade, end, rule))
+        start, span, total = cut, end, cut + end
+    return splices, None
+
+def apply_splices(audio_data: List[Sequence[int]], splices: List[Splice], backend) -> Sequence[int]:
+    """按拼接计划拼接各组件，返回音节音频
+
+    输出缓冲区按计划预先一次分配，各组件直接写入对应位置，交叉淡化在缓冲区上原地进行。
+    """
+    total = len(audio_data[0])
+    size = total
+    for splice in splices:
+        total = splice.cut + splice.end
+        size = max(size, total)
+    buffer = backend.zeros(size)
+    buffer[:len(audio_data[0])] = audio_data[0]
+    for data, splice in zip(audio_data[1:], splices):
+        backend.mix_into(buffer, splice.cut, data, splice.fade)
+        buffer[splice.cut + splice.fade:splice.cut + splice.end] = data[splice.fade:splice.end]
+    return buffer[:total] if total < size else buffer
+
+def render_components(syllable: List[str], file_paths: List[str], bank: Optional[SampleBank] = None,
+                      backend=None, cache: Optional[SyllableCache] = None,
+                      planned: Optional["SyllablePlan"] = None) -> Tuple[Optional[SyllableRender], Optional[str]]:
+    """拼接已解析出文件路径的音节，返回音频分段及拼接时间信息和错误信息
 
-def process_syllable(syllable: List[str], consonant_dirs: List[str], vowel_dir: str) -> Tuple[Optional[list], Optional[str]]:
-    """处理单个音节的拼接，返回音频数据和错误信息"""
-    # 获取所有组件的文件路径
-    file_paths = [component_to_path(comp, consonant_dirs, vowel_dir) for comp in syllable]
+    传入planned（预编译的音节计划）时，若读到的各组件采样数与计划一致，直接使用计划中的拼接位置。
+    """
+    if backend is None:
+        backend = ListBackend()
+    cache_key = (tuple(syllable), tuple(file_paths))
+    if cache is not None:
+        rendered = cache.get(cache_key)
+        if rendered is not None:
+            return rendered, None
     
     # 读取所有音频文件
     audio_data = []
     for path in file_paths:
-        data, error = read_wav(path)
+        data, error = bank.load(path) if bank is not None else backend.load(path)
         if error:
             return None, f"文件 {os.path.basename(path)}: {error}"
         audio_data.append(data)
     
-    # 根据组件数量处理不同类型的音节
-    if len(syllable) == 1:  # 纯元音
-        return audio_data[0], None
+    lengths = [len(data) for data in audio_data]
+    if planned is not None and list(planned.lengths) == lengths:
+        splices = list(planned.splices)
+    else:
+        splices, error = plan_syllable(syllable, lengths)
+        if error:
+            return None, error
+    rendered = SyllableRender([apply_splices(audio_data, splices, backend)], lengths, splices)
+    if cache is not None:
+        rendered = cache.put(cache_key, rendered, rendered.length)
+    return rendered, None
+
+def render_syllable(syllable: List[str], consonant_dirs: List[str], vowel_dir: str,
+                    bank: Optional[SampleBank] = None, backend=None,
+                    index: Optional[PhonemeIndex] = None,
+                    cache: Optional[SyllableCache] = None) -> Tuple[Optional[SyllableRender], Optional[str]]:
+    """处理单个音节的拼接，返回音频分段及拼接时间信息和错误信息
+
+    分段不拼接成整段，供流式写入使用；拼接计划同时用于生成oto.ini。
+    传入bank时通过样本缓存读取；backend决定音频数据类型（默认为列表后端）；
+    传入index时通过音素索引解析文件路径；传入cache时复用已拼接过的相同音节。
+    """
+    file_paths = [component_to_path(comp, consonant_dirs, vowel_dir, index) for comp in syllable]
+    return render_components(syllable, file_paths, bank, backend, cache)
+
+def process_syllable(syllable: List[str], consonant_dirs: List[str], vowel_dir: str,
+                     bank: Optional[SampleBank] = None, backend=None,
+                     index: Optional[PhonemeIndex] = None) -> Tuple[Optional[Sequence[int]], Optional[str]]:
+    """处理单个音节的拼接，返回音频数据和错误信息（参数含义同render_syllable）"""
+    if backend is None:
+        backend = ListBackend()
+    rendered, error = render_syllable(syllable, consonant_dirs, vowel_dir, bank, backend, index)
+    if error:
+        return None, error
+    return backend.concat(*rendered.chunks), None
+
+def split_mapping_line(line: str) -> Tuple[str, str]:
+    """将录音表行拆分为目标名称和映射字符串"""
+    parts = line.split('→')
+    if len(parts) != 2:
+        raise ValueError(f"无效的映射行: {line}")
+    return parts[0].strip(), parts[1].strip()
+
+def parse_line(line: str, parsed: Optional[dict] = None) -> Tuple[str, List[List[str]]]:
+    """解析一条映射行为（目标名称, 音节列表），无效行抛出ValueError
+
+    传入parsed字典时记录解析结果，同一录音表用于多个任务时每行只解析一次。
+    """
+    if parsed is not None and line in parsed:
+        return parsed[line]
+    target_name, mapping_str = split_mapping_line(line)
+    result = (target_name, parse_mapping(mapping_str))
+    if parsed is not None:
+        parsed[line] = result
+    return result
+
+def load_mapping_file(path: str) -> List[str]:
+    """读取映射文件（每行“目标名称 → 映射”，忽略空行和#开头的注释）"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def load_reclist(path: str) -> List[str]:
+    """读取录音表（每行一个目标名称，如 CVVC-ARPA FULL Reclist.txt）"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def select_reclist(mapping_lines: List[str], names: List[str]) -> Tuple[List[str], List[str]]:
+    """按录音表顺序选出对应的映射行，返回（映射行列表, 没有映射的目标名称）"""
+    by_name = {}
+    for line in mapping_lines:
+        try:
+            by_name.setdefault(split_mapping_line(line)[0], line)
+        except ValueError:
+            continue
+    selected = [by_name[name] for name in names if name in by_name]
+    return selected, [name for name in names if name not in by_name]
+
+def validate_syllable(syllable: List[str], index: PhonemeIndex) -> Optional[str]:
+    """检查音节中的音素是否都在CONSONANTS、VOWEL_MAPPING或元音目录中，返回错误信息"""
+    unknown = []
+    for comp in syllable:
+        if comp.endswith('-'):
+            known = comp[:-1] in CONSONANTS or comp == 'hh-'
+        else:
+            known = comp in ('n', 'ng', 'hh') or comp in VOWEL_MAPPING or index.exists(comp)
+        if not known:
+            unknown.append(comp)
+    if unknown:
+        return f"未知音素: {', '.join(unknown)}"
+    return None
+
+class SyllablePlan(NamedTuple):
+    """预编译的音节：组件、文件编号（指向RenderPlan.files）、各组件采样数和拼接计划"""
+    components: Tuple[str, ...]
+    files: Tuple[int, ...]
+    lengths: Tuple[int, ...]
+    splices: Tuple[Splice, ...]
+
+class RenderPlan(NamedTuple):
+    """预编译的录音渲染计划：解析、路径查找和拼接位置计算都已完成"""
+    line: str
+    target_name: str
+    files: Tuple[str, ...]
+    syllables: Tuple[SyllablePlan, ...]
+
+    @classmethod
+    def from_json(cls, data: list) -> "RenderPlan":
+        line, target_name, files, syllables = data
+        return cls(line, target_name, tuple(files), tuple(
+            SyllablePlan(tuple(components), tuple(ids), tuple(lengths), tuple(Splice(*splice) for splice in splices))
+            for components, ids, lengths, splices in syllables))
+
+def compile_plan(line: str, index: PhonemeIndex, header_cache: Optional[dict] = None,
+                 parsed: Optional[dict] = None, convert: bool = False) -> Tuple[Optional[RenderPlan], Optional[str]]:
+    """将一条映射行编译为渲染计划，返回计划和错误信息
+
+    只读取WAV文件头获得采样数，不读取音频数据。header_cache（路径 → (帧数, 错误)）
+    可在多条录音之间共享，避免重复读取同一文件头；parsed见parse_line；
+    convert为True时格式不符的音源按转换后的采样数计划（见read_wav_header）。
+    """
+    if header_cache is None:
+        header_cache = {}
+    try:
+        target_name, syllables = parse_line(line, parsed)
+    except ValueError as e:
+        return None, str(e)
     
-    elif len(syllable) == 2:  # 辅音+元音结构
-        consonant, vowel = audio_data
-        
-        # 计算辅音55%位置
-        overlap_start = int(len(consonant) * CONSONANT_OVERLAP_PERCENT)
-        
-        # 计算重叠部分长度（取辅音剩余长度和元音长度的最小值）
-        overlap_len = min(len(consonant) - overlap_start, len(vowel))
-        
-        # 分割音频
-        consonant_before = consonant[:overlap_start]
-        consonant_overlap = consonant[overlap_start:overlap_start+overlap_len]
-        vowel_overlap = vowel[:overlap_len]
-        vowel_after = vowel[overlap_len:]
-        
-        # 交叉淡化重叠部分
-        faded = cross_fade(consonant_overlap, vowel_overlap, overlap_len)
-        
-        # 拼接结果
-        return consonant_before + faded + vowel_after, None
+    # 先检查音素和文件是否存在，坏的录音在读取任何文件之前失败
+    for syllable in syllables:
+        error = validate_syllable(syllable, index)
+        if error:
+            return None, f"音节处理失败: {'-'.join(syllable)}: {error}"
+    missing = index.missing_files(syllables)
+    if missing:
+        return None, f"缺少音源文件: {', '.join(missing)}"
     
-    elif len(syllable) == 3:  # 辅音+元音+辅音结构
-        consonant1, vowel, consonant2 = audio_data
-        is_special_end = syllable[2] in ['n', 'ng']  # 检查是否为特殊结尾
-        
-        # 处理第一部分：辅音1 + 元音
-        overlap_start = int(len(consonant1) * CONSONANT_OVERLAP_PERCENT)
-        overlap_len1 = min(len(consonant1) - overlap_start, len(vowel))
+    files = []
+    syllable_plans = []
+    for syllable in syllables:
+        ids = []
+        lengths = []
+        for comp in syllable:
+            path = index.resolve(comp)
+            if path not in header_cache:
+                header_cache[path] = read_wav_header(path, convert)
+            nframes, error = header_cache[path]
+            if error:
+                return None, f"音节处理失败: {'-'.join(syllable)}: 文件 {os.path.basename(path)}: {error}"
+            if path not in files:
+                files.append(path)
+            ids.append(files.index(path))
+            lengths.append(nframes)
+        splices, error = plan_syllable(syllable, lengths)
+        if error:
+            return None, f"音节处理失败: {'-'.join(syllable)}: {error}"
+        syllable_plans.append(SyllablePlan(tuple(syllable), tuple(ids), tuple(lengths), tuple(splices)))
+    return RenderPlan(line, target_name, tuple(files), tuple(syllable_plans)), None
+
+def _source_stamp(path: str) -> Optional[list]:
+    """返回源文件的快速校验标记（普通文件为大小和修改时间，ZIP包内文件为大小和CRC32）"""
+    archive = split_archive_path(path)
+    if archive is not None:
+        source, inner_path = archive
+        info = source.member(inner_path)
+        return None if info is None else [info.file_size, info.CRC]
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+def compile_plans(lines: List[str], index: PhonemeIndex, params: dict, cache_path: Optional[str] = None,
+                  header_cache: Optional[dict] = None, parsed: Optional[dict] = None,
+                  convert: bool = False) -> Tuple[List[Tuple[str, Optional[RenderPlan], Optional[str]]], bool]:
+    """编译全部映射行，返回（[(映射行, 渲染计划, 错误信息)], 是否使用了缓存）
+
+    传入cache_path时，若录音表、参数、音源目录内容和所有引用文件的大小/修改时间都未变化，
+    直接读取缓存的计划，跳过解析和文件头读取；否则重新编译并写入缓存。
+    header_cache和parsed可在多个任务之间共享，convert见compile_plan。
+    """
+    listing = {
+        'consonant_dirs': index.consonant_dirs,
+        'vowel_dir': index.vowel_dir,
+        'consonants': sorted(index.consonants.items()),
+        'vowels': sorted(index.vowels),
+    }
+    key = hashlib.sha1(json.dumps([PLAN_CACHE_VERSION, lines, params, listing, convert],
+                                  ensure_ascii=False).encode('utf-8')).hexdigest()
+    if cache_path is not None:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = None
+        if cached and cached.get('key') == key and all(
+                _source_stamp(path) == stamp for path, stamp in cached['stamps'].items()):
+            return [(line, RenderPlan.from_json(plan) if plan else None, error)
+                    for line, plan, error in cached['entries']], True
+    
+    if header_cache is None:
+        header_cache = {}
+    entries = [(line,) + compile_plan(line, index, header_cache, parsed, convert) for line in lines]
+    if cache_path is not None:
+        # 校验标记取自计划引用的文件；失败的录音（只有少数）重新解析，记录已读取文件头的组件
+        stamps = {}
+        for line, plan, _ in entries:
+            if plan is not None:
+                paths = plan.files
+            else:
+                try:
+                    syllables = parse_line(line, parsed)[1]
+                except ValueError:
+                    continue
+                paths = [index.resolve(comp) for syllable in syllables for comp in syllable]
+            for path in paths:
+                if path in header_cache and path not in stamps:
+                    stamps[path] = _source_stamp(path)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'stamps': stamps, 'entries': entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    return entries, False
+
+def check_sample(file_path: str, convert: bool = True) -> Tuple[Optional[str], List[str]]:
+    """预检单个音源文件（只读取文件头），返回（错误信息, 警告信息列表）"""
+    info, error = read_wav_info(file_path)
+    if error:
+        return error, []
+    nchannels, sampwidth, framerate, nframes, tag = info
+    if nframes == 0:
+        return "音频为空", []
+    warnings = []
+    if _format_error(nchannels, sampwidth, framerate, tag):
+        description = f"{nchannels}声道，{sampwidth * 8}位{'浮点' if tag == WAVE_FORMAT_IEEE_FLOAT else ''}，{framerate}Hz"
+        if not convert:
+            return f"格式不符（{description}）", []
+        warnings.append(f"需要格式转换（{description}）")
+    if nframes < MIN_SAMPLE_DURATION * framerate:
+        warnings.append(f"时长过短（{nframes * 1000 / framerate:.1f} ms）")
+    return None, warnings
+
+# 截短提示中各拼接规则的名称
+FADE_LABELS = {'onset': "辅音重叠", 'vowel': "元音淡化", 'nasal': "结尾淡化", 'coda': "结尾淡化"}
+
+def clamped_fades(syllable: SyllablePlan) -> List[Tuple[int, str, int, int]]:
+    """返回音节拼接计划中被min(...)截短的交叉淡化：（组件位置, 拼接规则, 期望长度, 实际长度）
+
+    onset/vowel的截短由相邻音频过短引起；nasal/coda（韵尾）的截短可能来自韵尾音源自身的时长
+    （见tail_fade_limit，同一文件在每条录音中相同），也可能来自之前已拼接的音频过短。
+    """
+    clamped = []
+    span = syllable.lengths[0]
+    for i, splice in enumerate(syllable.splices, 1):
+        wanted = wanted_fade(splice.rule, span)
+        if splice.fade < wanted:
+            clamped.append((i, splice.rule, wanted, splice.fade))
+        span = splice.end
+    return clamped
+
+def format_warning(line: str, message: str, timestamp: str) -> str:
+    """返回预检警告条目（格式与error_report.txt的错误条目一致）"""
+    return f"[{timestamp}] 警告: {line}\n警告信息: {message}\n"
+
+def _phoneme_name(component: str) -> str:
+    """返回组件在别名中使用的音素名称（即音源文件名去掉横杠和扩展名）"""
+    return component_filename(component)[0][:-4].strip('-')
+
+def _ms(samples: float) -> str:
+    return f"{samples * 1000 / SAMPLE_RATE:.1f}"
+
+def _oto_line(file_name: str, alias: str, offset: int, consonant: int, cutoff: int,
+              preutterance: int, overlap: float) -> str:
+    """格式化一条oto.ini条目（参数均为采样数，偏移为文件内绝对位置，其余相对于偏移）"""
+    return (f"{file_name}={alias},{_ms(offset)},{_ms(consonant)},{_ms(-cutoff)},"
+            f"{_ms(preutterance)},{_ms(overlap)}")
+
+def oto_entries(file_name: str, syllable: List[str], rendered: SyllableRender, start: int) -> List[str]:
+    """根据音节的拼接计划生成CV、VC和V别名的oto.ini条目
+
+    start为音节在输出文件中的起始采样位置。每个组件的起点是其拼接处cut，
+    交叉淡化结束（cut+fade）后为稳定段，终点为下一次拼接的淡化结束处或音节末尾。
+    """
+    count = len(syllable)
+    starts = [0] + [splice.cut for splice in rendered.splices]
+    steadies = [0] + [splice.cut + splice.fade for splice in rendered.splices]
+    ends = steadies[1:] + [rendered.length]
+    names = [_phoneme_name(comp) for comp in syllable]
+    is_consonant = [component_filename(comp)[1] for comp in syllable]
+    
+    entries = []
+    for i in range(count):
+        if is_consonant[i]:
+            # VC：从元音稳定段末尾进入结尾辅音
+            if i > 0 and not is_consonant[i - 1]:
+                offset = max(steadies[i - 1], starts[i] - int(OTO_VC_LEAD * SAMPLE_RATE))
+                preutterance = starts[i] - offset
+                alias = OTO_VC_ALIAS.format(v=names[i - 1], c=names[i])
+                entries.append(_oto_line(file_name, alias, start + offset, steadies[i] - offset,
+                                         ends[i] - offset, preutterance, preutterance * OTO_OVERLAP_RATIO))
+            continue
         
-        consonant1_before = consonant1[:overlap_start]
-        consonant1_overlap = consonant1[overlap_start:overlap_start+overlap_len1]
-        vowel_overlap1 = vowel[:overlap_len1]
-        vowel_after1 = vowel[overlap_len1:]
+        # CV：从辅音起点开始，先行发声落在元音起点
+        if i > 0 and is_consonant[i - 1]:
+            offset = starts[i - 1]
+            preutterance = starts[i] - offset
+            alias = OTO_CV_ALIAS.format(c=names[i - 1], v=names[i])
+            entries.append(_oto_line(file_name, alias, start + offset, steadies[i] - offset,
+                                     ends[i] - offset, preutterance, preutterance * OTO_OVERLAP_RATIO))
         
-        faded1 = cross_fade(consonant1_overlap, vowel_overlap1, overlap_len1)
-        mid_data = consonant1_before + faded1 + vowel_after1
+        # V：元音稳定段
+        alias = OTO_V_ALIAS.format(v=names[i])
+        entries.append(_oto_line(file_name, alias, start + steadies[i], 0, ends[i] - steadies[i], 0, 0))
+    return entries
+
+def write_oto(output_dir: str, entries: Iterable[str]) -> str:
+    """一次性写入输出目录的oto.ini（同一别名只保留第一次出现的条目），返回文件路径"""
+    seen = set()
+    lines = []
+    for entry in entries:
+        alias = entry.split('=', 1)[1].split(',', 1)[0]
+        if alias not in seen:
+            seen.add(alias)
+            lines.append(entry)
+    oto_path = os.path.join(output_dir, "oto.ini")
+    with open(oto_path, 'w', encoding=OTO_ENCODING, errors='replace', newline='\r\n') as f:
+        f.write("\n".join(lines) + "\n" if lines else "")
+    return oto_path
+
+class RenderConfig(NamedTuple):
+    """渲染配置（可序列化，用于向工作进程传递）"""
+    consonant_dirs: Tuple[str, ...]
+    vowel_dir: str
+    output_dir: str
+    backend: str = 'list'
+    fade_curve: str = FADE_CURVE
+    profile: bool = False
+    convert: bool = True  # 自动转换格式不符的音源（否则视为错误）
+    convert_cache: Optional[str] = CONVERT_CACHE_DIR  # 格式转换缓存目录，None表示不缓存
+    match_gain: Optional[str] = None  # 音源增益匹配方式：peak、rms或None（不匹配）
+    source_level: Optional[float] = None  # 音源增益匹配的目标电平（dBFS），None表示使用SOURCE_LEVELS
+    gain_cache: Optional[str] = SOURCE_GAINS_CACHE  # 音源增益缓存文件，None表示不缓存
+    normalize: Optional[str] = None  # 输出归一化方式：peak、rms或None（不归一化）
+    output_level: Optional[float] = None  # 输出归一化的目标电平（dBFS），None表示使用OUTPUT_LEVELS
+    count_clips: bool = False  # 统计输出中的满幅（削波）采样数
+    sample_cache: int = SAMPLE_BANK_MAX_BYTES  # 样本缓存上限（字节）
+    syllable_cache: int = SYLLABLE_CACHE_MAX_BYTES  # 音节渲染缓存上限（字节），0表示不缓存
+
+def _audio_settings(config: RenderConfig) -> tuple:
+    """返回决定音频数据和缓存内容的配置项（相同时渲染器之间可以共享缓存）"""
+    return (config.backend, config.fade_curve, config.profile, config.convert, config.convert_cache,
+            config.match_gain, config.source_level, config.gain_cache, config.sample_cache, config.syllable_cache)
+
+class LineResult(NamedTuple):
+    """单条录音的渲染结果"""
+    line: str
+    target_name: Optional[str]
+    error: Optional[str] = None
+    timestamp: Optional[str] = None
+    oto: Tuple[str, ...] = ()  # 该文件的oto.ini条目
+    stats: Optional[dict] = None  # 性能统计（仅在开启统计时记录）
+    clipped: Optional[int] = None  # 输出中的满幅采样数（仅在开启归一化或削波统计时记录）
+    gains: Optional[dict] = None  # 工作进程新测量的音源增益（仅进程池模式，由主进程合并保存）
+
+    def report(self) -> str:
+        """返回错误报告条目（格式与error_report.txt一致）"""
+        return f"[{self.timestamp}] 处理失败: {self.line}\n错误信息: {self.error}\n"
+
+    @classmethod
+    def failure(cls, line: str, error: str) -> "LineResult":
+        """创建带当前时间戳的失败结果"""
+        return cls(line, None, error, datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+class Renderer:
+    """录音渲染器：持有路径配置、音频后端和样本缓存，逐条生成输出WAV
+
+    传入shared时，若音频后端、淡化曲线和统计设置相同，则与其共用后端、样本缓存、
+    音节缓存和文件头缓存（缓存均以文件路径为键，可在不同音源和输出目录之间共享）；
+    音源目录也相同时共用音素索引。
+    """
+
+    def __init__(self, config: RenderConfig, shared: Optional["Renderer"] = None):
+        self.config = config
+        if shared is not None and _audio_settings(shared.config) == _audio_settings(config):
+            self.backend = shared.backend
+            self.profiler = shared.profiler
+            self.bank = shared.bank
+            self.syllables = shared.syllables
+            self.headers = shared.headers
+            self.gains = shared.gains
+            self.silence = shared.silence
+            if (shared.config.consonant_dirs, shared.config.vowel_dir) == (config.consonant_dirs, config.vowel_dir):
+                self.index = shared.index
+            else:
+                self.index = PhonemeIndex(list(config.consonant_dirs), config.vowel_dir)
+            return
+        converter = SampleConverter(config.convert_cache, config.backend == 'numpy') if config.convert else None
+        self.backend = get_backend(config.backend, config.fade_curve, converter)
+        self.profiler = None
+        if config.profile:
+            self.profiler = Profiler()
+            self.backend = ProfiledBackend(self.backend, self.profiler)
+        self.gains = None
+        if config.match_gain:
+            self.gains = SourceGains(config.match_gain, _level(config.source_level, SOURCE_LEVELS, config.match_gain),
+                                     config.gain_cache)
+        self.bank = SampleBank(config.sample_cache, self.load, self.backend.sample_bytes)
+        self.syllables = None
+        if config.syllable_cache > 0:
+            self.syllables = SyllableCache(config.syllable_cache, self.backend.sample_bytes)
+        self.index = PhonemeIndex(list(config.consonant_dirs), config.vowel_dir)
+        self.headers = {}  # 文件头缓存（路径 → (帧数, 错误)），供render_line编译计划时使用
+        self.silence = self.backend.silence(SILENCE_DURATION)
+
+    def load(self, file_path: str) -> Tuple[Optional[Sequence[int]], Optional[str]]:
+        """读取音源（开启增益匹配时同时调整电平），供样本缓存调用"""
+        data, error = self.backend.load(file_path)
+        if error or self.gains is None:
+            return data, error
+        gain = self.gains.gain(file_path, data, self.backend)
+        return (data if gain == 1.0 else self.backend.scale(data, gain)), None
+
+    def iter_syllables(self, plan: RenderPlan) -> Iterator[SyllableRender]:
+        """逐个产出计划中音节的渲染结果，音节处理失败时抛出RuntimeError"""
+        for syllable in plan.syllables:
+            start = time.perf_counter()
+            rendered, error = render_components(list(syllable.components), [plan.files[i] for i in syllable.files],
+                                                self.bank, self.backend, self.syllables, syllable)
+            if self.profiler is not None:
+                self.profiler.add('syllable', time.perf_counter() - start, rendered.length if rendered else 0)
+            if error:
+                raise RuntimeError(f"音节处理失败: {'-'.join(syllable.components)}: {error}")
+            yield rendered
+
+    def render_line(self, line: str) -> LineResult:
+        """编译并渲染一条录音映射，错误记录在结果中而不是抛出"""
+        plan, error = compile_plan(line, self.index, self.headers, convert=self.config.convert)
+        if error:
+            return LineResult.failure(line, error)
+        return self.render_plan(plan)
+
+    @contextmanager
+    def profile_line(self, record: Optional[dict] = None):
+        """在当前线程统计一条录音（见Profiler.line），未开启统计时产出None"""
+        if self.profiler is None:
+            yield None
+        else:
+            with self.profiler.line(record) as record:
+                yield record
+
+    def render_plan(self, plan: RenderPlan) -> LineResult:
+        """按预编译的计划渲染一条录音并写入输出文件，错误记录在结果中而不是抛出"""
+        with self.profile_line() as record:
+            result = self._render_plan(plan)
+        return result if record is None else result._replace(stats=record)
+
+    def iter_chunks(self, plan: RenderPlan, oto: List[str]) -> Iterator[Sequence[int]]:
+        """逐段产出一条录音的音频（音节之间添加静音间隔），同时根据各音节在文件中的位置
+        将oto.ini条目追加到oto；音节处理失败时抛出RuntimeError"""
+        frames = 0
+        for i, (syllable, rendered) in enumerate(zip(plan.syllables, self.iter_syllables(plan))):
+            if i > 0:
+                yield self.silence
+                frames += len(self.silence)
+            oto.extend(oto_entries(f"{plan.target_name}.wav", list(syllable.components), rendered, frames))
+            yield from rendered.chunks
+            frames += rendered.length
+
+    def write_chunks(self, target_name: str, chunks: Iterable[Sequence[int]]):
+        """将音频分段流式写入输出文件，写入失败时抛出RuntimeError（不留下不完整的输出）"""
+        output_path = os.path.join(self.config.output_dir, f"{target_name}.wav")
+        writer = None
+        try:
+            writer = WavStreamWriter(output_path, self.backend.encode, self.profiler)
+            for chunk in chunks:
+                writer.write(chunk)
+            writer.close()
+        except (OSError, wave.Error) as e:
+            if writer is not None:
+                writer.abort()
+            raise RuntimeError(f"保存失败: 写入失败: {str(e)}")
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+
+    def output_chunks(self, plan: RenderPlan, oto: List[str], levels: dict) -> Iterable[Sequence[int]]:
+        """返回一条录音要写入的音频分段（oto.ini条目追加到oto）
+
+        未开启输出归一化时逐段流式产出；开启时先缓冲整条录音，一次扫描得到峰值、均方根和
+        满幅采样数后按增益调整。开启削波统计时满幅采样数记录在levels['clipped']（写入完成后有效）。
+        """
+        config = self.config
+        chunks = self.iter_chunks(plan, oto)
+        if config.normalize:
+            chunks = list(chunks)
+            peak = squares = clipped = count = 0
+            for chunk in chunks:
+                chunk_peak, chunk_squares, chunk_clipped = self.backend.levels(chunk)
+                peak = max(peak, chunk_peak)
+                squares += chunk_squares
+                clipped += chunk_clipped
+                count += len(chunk)
+            gain = level_gain(config.normalize, _level(config.output_level, OUTPUT_LEVELS, config.normalize),
+                              peak, squares, count)
+            if gain != 1.0:
+                chunks = [self.backend.scale(chunk, gain) for chunk in chunks]
+            # 削波发生在拼接阶段，归一化前的满幅采样数才反映失真
+            levels['clipped'] = clipped
+        elif config.count_clips:
+            chunks = self._count_clips(chunks, levels)
+        return chunks
+
+    def _count_clips(self, chunks: Iterable[Sequence[int]], levels: dict) -> Iterator[Sequence[int]]:
+        levels['clipped'] = 0
+        for chunk in chunks:
+            levels['clipped'] += self.backend.levels(chunk)[2]
+            yield chunk
+
+    def _render_plan(self, plan: RenderPlan) -> LineResult:
+        try:
+            # 逐个音节处理并流式写入，内存占用不超过最长的音节（开启输出归一化时为整条录音）
+            oto = []
+            levels = {}
+            self.write_chunks(plan.target_name, self.output_chunks(plan, oto, levels))
+            return LineResult(plan.line, plan.target_name, oto=tuple(oto), clipped=levels.get('clipped'))
+        except Exception as e:
+            return LineResult.failure(plan.line, str(e))
+
+def get_renderer(renderers: Dict[RenderConfig, Renderer], config: RenderConfig) -> Renderer:
+    """返回配置对应的渲染器，不存在时创建（与已有的渲染器共享缓存）"""
+    renderer = renderers.get(config)
+    if renderer is None:
+        renderer = Renderer(config, next(iter(renderers.values()), None))
+        renderers[config] = renderer
+    return renderer
+
+# 工作进程内的渲染器（每个进程各自持有样本缓存，各任务配置的渲染器之间共享）
+_worker_renderers: Dict[RenderConfig, Renderer] = {}
+
+def _init_worker(configs: Sequence[RenderConfig]):
+    """进程池初始化：在工作进程中为每个任务配置创建渲染器"""
+    for config in configs:
+        get_renderer(_worker_renderers, config)
+
+def _render_task_in_worker(task: Tuple[RenderConfig, RenderPlan]) -> LineResult:
+    config, plan = task
+    renderer = get_renderer(_worker_renderers, config)
+    result = renderer.render_plan(plan)
+    if renderer.gains is not None:
+        gains = renderer.gains.take_new()
+        if gains:
+            result = result._replace(gains=gains)
+    return result
+
+def _render_task(task: Tuple[Renderer, RenderPlan]) -> LineResult:
+    renderer, plan = task
+    return renderer.render_plan(plan)
+
+def render_tasks(tasks: Iterable[Tuple[Renderer, RenderPlan]], workers: int = 1,
+                 pool: str = 'process') -> Iterator[LineResult]:
+    """渲染（渲染器, 计划）任务，按输入顺序逐条产出结果；不同输出目录的任务共用同一个工作池
+
+    pool为pipeline时使用流水线渲染（见render_pipelined，忽略workers）；否则workers为1时
+    在当前线程顺序渲染，大于1时使用进程池（各进程独立缓存）或线程池（共享renderer的样本缓存）并行渲染。
+    """
+    if pool == 'pipeline':
+        yield from render_pipelined(tasks)
+    elif workers <= 1:
+        yield from map(_render_task, tasks)
+    elif pool == 'thread':
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(_render_task, tasks)
+    else:
+        tasks = list(tasks)
+        configs = list(dict.fromkeys(renderer.config for renderer, _ in tasks))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(configs,)) as executor:
+            yield from executor.map(_render_task_in_worker, [(renderer.config, plan) for renderer, plan in tasks],
+                                    chunksize=PARALLEL_CHUNK_SIZE)
+
+def _pipeline_put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """向有界队列放入一项，队列已满时等待（背压）；流水线已停止时返回False"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _pipeline_get(q: queue.Queue, stop: threading.Event):
+    """从队列取出一项，流水线已停止时返回None（与结束标记相同）"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
+
+def render_pipelined(tasks: Iterable[Tuple[Renderer, RenderPlan]],
+                     depth: int = PIPELINE_DEPTH) -> Iterator[LineResult]:
+    """流水线渲染：预读、混音和写入分别在三个线程中重叠进行，按输入顺序逐条产出结果
+
+    预读线程把之后录音用到的样本提前载入样本缓存，混音线程拼接音节，写入线程在后台写出WAV。
+    阶段之间是容量为depth的有界队列，下游较慢时上游等待，同时在途的录音不超过约3×depth条。
+    适合音源位于网络共享等I/O延迟与计算耗时相当的场景。
+    """
+    stop = threading.Event()
+    loaded = queue.Queue(depth)   # (渲染器, 计划, 统计记录)
+    mixed = queue.Queue(depth)    # (渲染器, 计划, 统计记录, 音频分段, oto条目, 电平统计, 错误信息)
+    results = queue.Queue(depth)  # LineResult
+    errors = []
+
+    def prefetch():
+        for renderer, plan in tasks:
+            with renderer.profile_line() as record:
+                for path in plan.files:
+                    if stop.is_set():
+                        return
+                    renderer.bank.prefetch(path)
+            if not _pipeline_put(loaded, (renderer, plan, record), stop):
+                return
+
+    def mix():
+        while True:
+            task = _pipeline_get(loaded, stop)
+            if task is None:
+                return
+            renderer, plan, record = task
+            oto = []
+            levels = {}
+            try:
+                with renderer.profile_line(record):
+                    chunks = list(renderer.output_chunks(plan, oto, levels))
+                item = (renderer, plan, record, chunks, oto, levels, None)
+            except Exception as e:
+                item = (renderer, plan, record, None, None, None, str(e))
+            if not _pipeline_put(mixed, item, stop):
+                return
+
+    def write():
+        while True:
+            item = _pipeline_get(mixed, stop)
+            if item is None:
+                return
+            renderer, plan, record, chunks, oto, levels, error = item
+            if error is None:
+                try:
+                    with renderer.profile_line(record):
+                        renderer.write_chunks(plan.target_name, chunks)
+                    result = LineResult(plan.line, plan.target_name, oto=tuple(oto), clipped=levels.get('clipped'))
+                except Exception as e:
+                    result = LineResult.failure(plan.line, str(e))
+            else:
+                result = LineResult.failure(plan.line, error)
+            if not _pipeline_put(results, result if record is None else result._replace(stats=record), stop):
+                return
+
+    def run(stage, output: queue.Queue):
+        # 每个阶段结束（包括异常退出）时向下游放入结束标记
+        try:
+            stage()
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            _pipeline_put(output, None, stop)
+
+    threads = [threading.Thread(target=run, args=(stage, output), daemon=True)
+               for stage, output in ((prefetch, loaded), (mix, mixed), (write, results))]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            result = results.get()
+            if result is None:
+                break
+            yield result
+        if errors:
+            raise errors[0]
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+def render_params(config: RenderConfig) -> dict:
+    """返回影响输出内容的全部参数（任一变化都需要重新生成所有文件）"""
+    params = {
+        'sample_rate': SAMPLE_RATE,
+        'silence_duration': SILENCE_DURATION,
+        'cross_fade_vowel': CROSS_FADE_VOWEL,
+        'consonant_overlap_percent': CONSONANT_OVERLAP_PERCENT,
+        'end_consonant_fade_percent': END_CONSONANT_FADE_PERCENT,
+        'end_consonant_retain_percent': END_CONSONANT_RETAIN_PERCENT,
+        'fade_curve': config.fade_curve,
+    }
+    # 音量处理参数只在开启时记录，未开启时与之前生成的清单兼容
+    if config.match_gain:
+        params['match_gain'] = [config.match_gain, _level(config.source_level, SOURCE_LEVELS, config.match_gain)]
+    if config.normalize:
+        params['normalize'] = [config.normalize, _level(config.output_level, OUTPUT_LEVELS, config.normalize)]
+    return params
+
+def _level(level_db: Optional[float], defaults: dict, mode: str) -> float:
+    """返回目标电平（未指定时使用该方式的默认值）"""
+    return defaults[mode] if level_db is None else level_db
+
+class BuildManifest:
+    """增量构建清单：记录每个输出文件的源文件指纹和生成参数
+
+    清单保存在输出目录中。源文件指纹为（大小, 修改时间, SHA-1），
+    大小和修改时间未变时直接沿用上次的哈希，不重新读取文件内容。
+    """
+
+    def __init__(self, output_dir: str, params: dict):
+        self.path = os.path.join(output_dir, BUILD_MANIFEST_NAME)
+        self.output_dir = output_dir
+        self.params = params
+        self._fingerprints = {}  # 本次运行中已计算的指纹
+        self._previous = {}      # 上次运行记录的指纹（路径 → 指纹）
+        self.targets = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {}
+        # 参数变化时丢弃全部旧记录，所有目标都需要重新生成
+        if stored.get('params') == params:
+            self.targets = stored.get('targets', {})
+        for entry in stored.get('targets', {}).values():
+            for path, fingerprint in entry.get('sources', {}).items():
+                self._previous[path] = fingerprint
+
+    def fingerprint(self, path: str) -> Optional[list]:
+        """返回源文件指纹 [大小, 修改时间(ns), SHA-1]，文件不存在时返回None"""
+        if path in self._fingerprints:
+            return self._fingerprints[path]
+        archive = split_archive_path(path)
+        if archive is not None:
+            # ZIP包内文件直接使用中央目录中的大小和CRC32，无需读取内容
+            source, inner_path = archive
+            info = source.member(inner_path)
+            fingerprint = None if info is None else [info.file_size, list(info.date_time), f"crc32:{info.CRC:08x}"]
+            self._fingerprints[path] = fingerprint
+            return fingerprint
+        try:
+            st = os.stat(path)
+        except OSError:
+            fingerprint = None
+        else:
+            previous = self._previous.get(path)
+            if previous and previous[0] == st.st_size and previous[1] == st.st_mtime_ns:
+                fingerprint = previous
+            else:
+                with open(path, 'rb') as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()
+                fingerprint = [st.st_size, st.st_mtime_ns, digest]
+        self._fingerprints[path] = fingerprint
+        return fingerprint
+
+    def is_up_to_date(self, target_name: str, line: str, paths: List[str]) -> bool:
+        """判断目标是否无需重新生成（映射、参数和所有源文件内容均未变化且输出存在）"""
+        entry = self.targets.get(target_name)
+        if entry is None or entry.get('line') != line:
+            return False
+        if not os.path.exists(os.path.join(self.output_dir, f"{target_name}.wav")):
+            return False
+        sources = entry.get('sources', {})
+        if set(sources) != set(paths):
+            return False
+        for path in paths:
+            fingerprint = self.fingerprint(path)
+            if fingerprint is None or fingerprint[2] != sources[path][2]:
+                return False
+        return True
+
+    def record(self, target_name: str, line: str, paths: List[str], oto: Iterable[str] = ()):
+        """记录成功生成的目标及其oto.ini条目"""
+        self.targets[target_name] = {
+            'line': line,
+            'sources': {path: self.fingerprint(path) for path in paths},
+            'oto': list(oto),
+        }
+
+    def discard(self, target_name: str):
+        """移除目标记录（生成失败时调用，下次运行会重试）"""
+        self.targets.pop(target_name, None)
+
+    def prune(self, current_targets: Iterable[str]) -> List[str]:
+        """删除已不在录音表中的旧输出文件，返回被删除的目标名称"""
+        current = set(current_targets)
+        removed = []
+        for target_name in sorted(set(self.targets) - current):
+            output_path = os.path.join(self.output_dir, f"{target_name}.wav")
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            del self.targets[target_name]
+            removed.append(target_name)
+        return removed
+
+    def save(self):
+        """写入清单（先写临时文件再替换，避免中断时损坏）"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'params': self.params, 'targets': self.targets}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+def summarize_profile(results: List[LineResult], wall_seconds: float, top: int = 10) -> dict:
+    """汇总各条录音的性能统计，返回可序列化为JSON的摘要"""
+    stages = {}
+    lines = []
+    for result in results:
+        if result.stats is None:
+            continue
+        for stage, (calls, seconds, samples, nbytes) in result.stats['stages'].items():
+            total = stages.setdefault(stage, {'calls': 0, 'seconds': 0.0, 'samples': 0, 'bytes': 0})
+            total['calls'] += calls
+            total['seconds'] += seconds
+            total['samples'] += samples
+            total['bytes'] += nbytes
+        stage_stats = result.stats['stages']
+        lines.append({
+            'line': result.line,
+            'target': result.target_name,
+            'error': result.error,
+            'seconds': result.stats['seconds'],
+            'samples_written': stage_stats.get('write_wav', [0, 0.0, 0, 0])[2],
+            'bytes_read': stage_stats.get('read_wav', [0, 0.0, 0, 0])[3],
+            'bytes_written': stage_stats.get('write_wav', [0, 0.0, 0, 0])[3],
+            'stage_seconds': {stage: entry[1] for stage, entry in stage_stats.items()},
+        })
+    audio_seconds = sum(line['samples_written'] for line in lines) / SAMPLE_RATE
+    return {
+        'wall_seconds': wall_seconds,
+        'lines': len(lines),
+        'audio_seconds': audio_seconds,
+        'realtime_factor': audio_seconds / wall_seconds if wall_seconds > 0 else None,
+        'stages': stages,
+        'slowest': sorted(lines, key=lambda line: line['seconds'], reverse=True)[:top],
+        'per_line': lines,
+    }
+
+def write_profile(path: str, summary: dict) -> str:
+    """写入JSON统计摘要，并在同名.csv文件中写入每条录音的明细，返回CSV路径"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=1)
+    csv_path = os.path.splitext(path)[0] + ".csv"
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['target', 'seconds', 'samples_written', 'bytes_read', 'bytes_written', 'error']
+                        + [f"{stage}_seconds" for stage in PROFILE_STAGES])
+        for line in summary['per_line']:
+            writer.writerow([line['target'] or line['line'], f"{line['seconds']:.6f}", line['samples_written'],
+                             line['bytes_read'], line['bytes_written'], line['error'] or '']
+                            + [f"{line['stage_seconds'].get(stage, 0.0):.6f}" for stage in PROFILE_STAGES])
+    return csv_path
+
+def write_error_report(output_dir: str, error_reports: List[str], file_name: str = "error_report.txt",
+                       title: str = "音频处理错误报告") -> str:
+    """写入错误报告，返回报告路径"""
+    report_path = os.path.join(output_dir, file_name)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(f"{title}（生成时间：{datetime.datetime.now()}）\n")
+        f.write("="*50 + "\n")
+        f.write("\n".join(error_reports))
+    return report_path
+
+def load_jobs(path: str, defaults: RenderConfig) -> List[RenderConfig]:
+    """读取批量任务列表（JSON数组，每项包含consonant_dirs、vowel_dir、output_dir）
+
+    未指定的音源目录使用defaults中的值（命令行路径，相对于当前目录）；
+    任务文件中的相对路径相对于任务文件所在目录。
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError("任务文件应为JSON数组")
+    configs = []
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict) or 'output_dir' not in entry:
+            raise ValueError(f"第{i + 1}个任务缺少output_dir")
+        consonant_dirs = defaults.consonant_dirs
+        if 'consonant_dirs' in entry:
+            consonant_dirs = entry['consonant_dirs']
+            if isinstance(consonant_dirs, str):
+                consonant_dirs = [consonant_dirs]
+            consonant_dirs = tuple(os.path.join(base_dir, d) for d in consonant_dirs)
+        vowel_dir = defaults.vowel_dir
+        if 'vowel_dir' in entry:
+            vowel_dir = os.path.join(base_dir, entry['vowel_dir'])
+        configs.append(defaults._replace(consonant_dirs=consonant_dirs, vowel_dir=vowel_dir,
+                                         output_dir=os.path.join(base_dir, entry['output_dir'])))
+    return configs
+
+class BuildJob:
+    """一个输出目录的构建任务：编译渲染计划、增量检查、记录渲染结果并写入oto.ini
+
+    label非空时（批量模式）输出信息带有任务标签，以区分不同输出目录。
+    """
+
+    def __init__(self, renderer: Renderer, label: str = ""):
+        self.renderer = renderer
+        self.config = renderer.config
+        self.label = label
+        self.manifest = BuildManifest(self.config.output_dir, render_params(self.config))
+        self.current_targets = []
+        self.pending = []
+        self.error_reports = []
+
+    def log(self, message: str):
+        print(f"[{self.label}] {message}" if self.label else message)
+
+    def fail(self, result: LineResult):
+        self.error_reports.append(result.report())
+        self.log(f"错误: {result.line} - {result.error}")
+
+    def prepare(self, mapping_table: List[str], force: bool = False, parsed: Optional[dict] = None,
+                prune: bool = True):
+        """编译渲染计划并确定需要重新生成的录音（pending）
+
+        prune为False时（录音表只选出部分录音），保留输出目录中不在本次录音表里的旧输出。
+        """
+        config = self.config
+        os.makedirs(config.output_dir, exist_ok=True)
+        index = self.renderer.index
+        for filename, paths in sorted(index.shadowed.items()):
+            self.log(f"警告: {filename} 存在多个版本，使用 {index.consonants[filename]}，忽略 {', '.join(paths)}")
+
+        # 编译渲染计划（音素校验、路径解析和拼接位置计算），录音表和音源未变化时直接读取缓存
+        entries, cached = compile_plans(mapping_table, index, render_params(config),
+                                        os.path.join(config.output_dir, PLAN_CACHE_NAME),
+                                        self.renderer.headers, parsed, config.convert)
+        if cached:
+            self.log("使用缓存的渲染计划")
+        plans = [plan for _, plan, _ in entries if plan is not None]
+        failed = [LineResult.failure(line, error) for line, plan, error in entries if plan is None]
+        if failed:
+            self.log(f"计划检查: {len(failed)} 条录音无法渲染，将跳过")
+
+        # 增量构建：跳过映射、参数和源文件均未变化的目标，删除已移出录音表的旧输出
+        # 目标名称取自计划（缓存命中时不重新解析映射）
+        manifest = self.manifest
+        for line, plan, _ in entries:
+            if plan is not None:
+                self.current_targets.append(plan.target_name)
+                continue
+            try:
+                self.current_targets.append(split_mapping_line(line)[0])
+            except ValueError:
+                continue
+        self.pending = [plan for plan in plans
+                        if force or not manifest.is_up_to_date(plan.target_name, plan.line, list(plan.files))]
+        if prune:
+            for target_name in manifest.prune(self.current_targets):
+                self.log(f"删除过期输出: {target_name}.wav")
+        skipped = len(plans) - len(self.pending)
+        if skipped:
+            self.log(f"跳过未变化的文件: {skipped} 个")
+
+        for result in failed:
+            try:
+                manifest.discard(split_mapping_line(result.line)[0])
+            except ValueError:
+                pass
+            self.fail(result)
+
+    def check(self, mapping_table: List[str], parsed: Optional[dict] = None) -> Tuple[int, int]:
+        """预检：编译每条映射并检查引用的音源和拼接计划，只读取WAV文件头，不渲染也不写入输出
         
-        # 处理第二部分：元音 + 辅音2
-        if is_special_end:
-            # 特殊结尾（n/ng）：使用元音时长的30%进行交叉淡化
-            fade_len = int(len(vowel) * END_CONSONANT_FADE_PERCENT)
-            fade_len = min(fade_len, len(mid_data), len(consonant2))
-            
-            # 分割音频
-            mid_end = mid_data[-fade_len:]
-            mid_before = mid_data[:-fade_len]
-            consonant2_fade = consonant2[:fade_len]
-            
-            # 交叉淡化
-            faded_end = cross_fade(mid_end, consonant2_fade, fade_len)
-            return mid_before + faded_end, None
+        检查结果以与错误报告相同的格式记录在error_reports中，返回（错误数, 警告数）。
+        """
+        config = self.config
+        index = self.renderer.index
+        timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        errors = 0
+        warnings = []
+        for filename, paths in sorted(index.shadowed.items()):
+            self.log(f"警告: {filename} 存在多个版本，使用 {index.consonants[filename]}，忽略 {', '.join(paths)}")
+
+        plans = []
+        targets = {}
+        for line in mapping_table:
+            plan, error = compile_plan(line, index, self.renderer.headers, parsed, config.convert)
+            if error:
+                self.fail(LineResult(line, None, error, timestamp))
+                errors += 1
+                continue
+            plans.append(plan)
+            if plan.target_name in targets:
+                warnings.append((line, f"目标名称与 {targets[plan.target_name]} 重复，输出文件会被覆盖"))
+            targets.setdefault(plan.target_name, line)
+
+        # 每个音源文件只检查一次
+        for path in dict.fromkeys(path for plan in plans for path in plan.files):
+            error, messages = check_sample(path, config.convert)
+            if error:
+                self.fail(LineResult(path, None, error, timestamp))
+                errors += 1
+            warnings.extend((path, message) for message in messages)
+        # 相邻音频过短引起的截短逐条报告；韵尾音源自身时长引起的截短按文件只报告一次
+        tails = {}  # 路径 → (拼接规则, 实际长度, 受影响的录音)
+        for plan in plans:
+            for syllable in plan.syllables:
+                for i, rule, wanted, fade in clamped_fades(syllable):
+                    if rule in ('nasal', 'coda') and fade == tail_fade_limit(rule, syllable.lengths[i]):
+                        path = plan.files[syllable.files[i]]
+                        tails.setdefault(path, (rule, fade, {}))[2].setdefault(plan.line)
+                    else:
+                        warnings.append((plan.line, f"{'-'.join(syllable.components)}: {FADE_LABELS[rule]} "
+                                                    f"{_ms(wanted)} ms 被截短为 {_ms(fade)} ms"))
+        for path, (rule, fade, lines) in tails.items():
+            warnings.append((path, f"作为韵尾时{FADE_LABELS[rule]}受音源时长限制为 {_ms(fade)} ms"
+                                   f"（影响 {len(lines)} 条录音）"))
+
+        for line, message in warnings:
+            self.error_reports.append(format_warning(line, message, timestamp))
+            self.log(f"警告: {line} - {message}")
+        return errors, len(warnings)
+
+    def record(self, plan: RenderPlan, result: LineResult):
+        """记录一条录音的渲染结果"""
+        if result.gains and self.renderer.gains is not None:
+            self.renderer.gains.update(result.gains)
+        if result.error is None:
+            self.manifest.record(plan.target_name, plan.line, list(plan.files), result.oto)
+            self.log(f"成功生成: {result.target_name}.wav")
+            if result.clipped:
+                self.log(f"警告: {result.target_name}.wav 有 {result.clipped} 个满幅（削波）采样")
         else:
-            # 普通结尾：辅音2前90%与元音交叉淡化，保留最后10%
-            fade_len = int(len(vowel) * END_CONSONANT_FADE_PERCENT)
-            fade_len = min(fade_len, len(mid_data), int(len(consonant2) * 0.9))
-            
-            # 分割音频
-            mid_end = mid_data[-fade_len:]
-            mid_before = mid_data[:-fade_len]
-            consonant2_fade = consonant2[:fade_len]
-            consonant2_after = consonant2[fade_len:]
-            
-            # 交叉淡化
-            faded_end = cross_fade(mid_end, consonant2_fade, fade_len)
-            return mid_before + faded_end + consonant2_after, None
-    
-    return None, f"不支持的组件数量: {len(syllable)}"
+            self.manifest.discard(plan.target_name)
+            self.fail(result)
+
+    def finish(self, oto: bool = True):
+        """保存构建清单和音源增益缓存（共用同一增益缓存的任务只会实际写入一次），按录音表顺序汇总oto.ini条目（未重新生成的文件使用清单中记录的条目）并一次写入"""
+        self.manifest.save()
+        if self.renderer.gains is not None:
+            self.renderer.gains.save()
+        if oto:
+            # 未清理旧输出时，保留下来的文件排在本次录音表之后，oto.ini仍覆盖输出目录中的所有文件
+            targets = list(dict.fromkeys(self.current_targets + list(self.manifest.targets)))
+            entries = []
+            for target_name in targets:
+                entries.extend(self.manifest.targets.get(target_name, {}).get('oto', []))
+            self.log(f"oto.ini已保存至: {write_oto(self.config.output_dir, entries)}")
 
-def main():
+def check_jobs(jobs: List[BuildJob], mapping_table: List[str], error_reports: List[str],
+               parsed: Optional[dict], report_dir: str) -> int:
+    """预检所有任务并写入check_report.txt（格式同error_report.txt），有错误时返回1"""
+    start = time.perf_counter()
+    errors = len(error_reports)  # 录音表中没有映射的条目
+    warnings = 0
+    for job in jobs:
+        job_errors, job_warnings = job.check(mapping_table, parsed)
+        errors += job_errors
+        warnings += job_warnings
+        if job.error_reports and job.label:
+            error_reports.append(f"任务: {job.label}\n" + "-"*50)
+        error_reports.extend(job.error_reports)
+    print(f"预检完成: {len(mapping_table)} 条录音，{errors} 个错误，{warnings} 个警告，"
+          f"耗时 {time.perf_counter() - start:.2f} 秒")
+    if error_reports:
+        os.makedirs(report_dir, exist_ok=True)
+        report_path = write_error_report(report_dir, error_reports, "check_report.txt", "录音表预检报告")
+        print(f"预检报告已保存至: {report_path}")
+    return 1 if errors else 0
+
+def main(argv: Optional[List[str]] = None):
     # 路径配置（更新以包含新增的辅音目录）
     consonant_dirs = [
         r"E:\桌面\Nonbio\STEMguys\Standard_English\NewStandardC",
@@ -252,211 +2491,147 @@ def main():
     ]
     vowel_dir = r"E:\桌面\Nonbio\STEMguys\Standard_English\vowels"
     output_dir = r"E:\桌面\Nonbio\STEMguys\Standard_English\output_test"
-    
-    # 录音表映射关系（更新以包含新的音节组合）
-    mapping_table = [
-        "aa-iy-aa-uw-aa-eh → a_i_a_u_a_e",
-        "eh-aa-ow-aa-ay-iy → e_a_ou_a_ai_i",
-        "iy-uw-iy-eh-iy-ow → i_u_i_e_i_ou",
-        "ow-iy-ay-uw-eh-uw → ou_i_ai_u_e_u",
-        "uw-ow-uw-ay-eh-ow → u_ou_u_ai_e_ou",
-        "ow-eh-ay-ow-ay-aa → ou_e_ai_ou_ai_a",
-        "naa-niy-nuw-neh-now-nayn → n-a_n-i_n-u_n-e_n-ou_n-ai-n",
-        "ngaa-ngiy-nguw-ngeh-ngow-ngayng → ng-a_ng-i_ng-u_ng-e_ng-ou_ng-ai-ng",
-        "baa-biy-buw-beh-bow-bayb → b-a_b-i_b-u_b-e_b-ou_b-ai-b",
-        "chaa-chiy-chuw-cheh-chow-chaych → ch-a_ch-i_ch-u_ch-e_ch-ou_ch-ai-ch",
-        "daa-diy-duw-deh-dow-dayd → d-a_d-i_d-u_d-e_d-ou_d-ai-d",
-        "dhaa-dhiy-dhuw-dheh-dhow-dhaydh → th-a_th-i_th-u_th-e_th-ou_th-ai-th",
-        "faa-fiy-fuw-feh-fow-fayf → f-a_f-i_f-u_f-e_f-ou_f-ai-f",
-        "gaa-giy-guw-geh-gow-gayg → g-a_g-i_g-u_g-e_g-ou_g-ai-g",
-        "hhaa-hhiy-hhuw-hhe-hhow-hhayhh → h-a_h-i_h-u_h-e_h-ou_h-ai-h",
-        "jhaa-jhiy-jhuw-jheh-jhow-jhayjh → j-a_j-i_j-u_j-e_j-ou_j-ai-j",
-        "kaa-kiy-kuw-keh-kow-kayk → k-a_k-i_k-u_k-e_k-ou_k-ai-k",
-        "laa-liy-luw-leh-low-layl → l-a_l-i_l-u_l-e_l-ou_l-ai-l",
-        "maa-miy-muw-meh-mow-maym → m-a_m-i_m-u_m-e_m-ou_m-ai-m",
-        "paa-piy-puw-peh-pow-payp → p-a_p-i_p-u_p-e_p-ou_p-ai-p",
-        "qaa-qiy-quw-qeh-qow-qayq → k-a_k-i_k-u_k-e_k-ou_k-ai-k",
-        "raa-riy-ruw-reh-row-rayr → r-a_r-i_r-u_r-e_r-ou_r-ai-r",
-        "saa-siy-suw-seh-sow-says → s-a_s-i_s-u_s-e_s-ou_s-ai-s",
-        "shaa-shiy-shuw-sheh-show-shaysh → sh-a_sh-i_sh-u_sh-e_sh-ou_sh-ai-sh",
-        "taa-tiy-tuw-teh-tow-tayt → t-a_t-i_t-u_t-e_t-ou_t-ai-t",
-        "vaa-viy-vuw-veh-vow-vayv → v-a_v-i_v-u_v-e_v-ou_v-ai-v",
-        "waa-wiy-wuw-weh-wow-wayw → w-a_w-i_w-u_w-e_w-ou_w-ai-w",
-        "yaa-yi-yuw-yeh-yow-yayy → y-a_y-i_y-u_y-e_y-ou_y-ai-y",
-        "zaa-ziy-zuw-zeh-zow-zay → z-a_z-i_z-u_z-e_z-ou_z-ai",
-        "ae-ao-ae-ih-ae-uh-ae → e_o_e_i_e_a_e",
-        "ae-aw-ae-ey-ae-oy-ao → e_o_e_ei_e_oi_o",
-        "ao-ih-ao-uh-ao-aw-ao → o_i_o_a_o_o_o",
-        "ao-ey-ao-oy-ih-uh-ih → o_ei_o_oi_i_a_i",
-        "ih-aw-ih-ey-ih-oy-uh → i_o_i_ei_i_oi_a",
-        "uh-aw-uh-ey-uh-oy-aw → a_o_a_ei_a_oi_o",
-        "aw-ey-aw-oy-ey-oy-ae → o_ei_o_oi_ei_oi_e",
-        "bae-bao-bih-buh-baw-bey-boyb → b-e_b-o_b-i_b-a_b-o_b-ei_b-oi-b",
-        "chae-chao-chih-chuh-chaw-chey-choych → ch-e_ch-o_ch-i_ch-a_ch-o_ch-ei_ch-oi-ch",
-        "dae-dao-dih-duh-daw-dey-doyd → d-e_d-o_d-i_d-a_d-o_d-ei_d-oi-d",
-        "dhae-dhao-dhih-dhuh-dhaw-dhey-dhoydh → th-e_th-o_th-i_th-a_th-o_th-ei_th-oi-th",
-        "fae-fao-fih-fuh-faw-fey-foyf → f-e_f-o_f-i_f-a_f-o_f-ei_f-oi-f",
-        "gae-gao-gih-guh-gaw-gey-goyg → g-e_g-o_g-i_g-a_g-o_g-ei_g-oi-g",
-        "hhae-hhao-hhih-hhuh-hhaw-hhey-hhoyh → h-e_h-o_h-i_h-a_h-o_h-ei_h-oi-h",
-        "jhae-jhao-jhih-jhuh-jhaw-jhey-jhoyj → j-e_j-o_j-i_j-a_j-o_j-ei_j-oi-j",
-        "kae-kao-kih-kuh-kaw-key-koyk → k-e_k-o_k-i_k-a_k-o_k-ei_k-oi-k",
-        "lae-lao-lih-luh-law-ley-loyl → l-e_l-o_l-i_l-a_l-o_l-ei_l-oi-l",
-        "mae-mao-mih-muh-maw-mey-moym → m-e_m-o_m-i_m-a_m-o_m-ei_m-oi-m",
-        "nae-nao-nih-nuh-naw-ney-noyn → n-e_n-o_n-i_n-a_n-o_n-ei_n-oi-n",
-        "ngae-ngao-ngih-nguh-ngaw-ngey-ngoyng → ng-e_ng-o_ng-i_ng-a_ng-o_ng-ei_ng-oi-ng",
-        "pae-pao-pih-puh-paw-pey-poyp → p-e_p-o_p-i_p-a_p-o_p-ei_p-oi-p",
-        "qae-qao-qih-quh-qaw-qey-qoyq → k-e_k-o_k-i_k-a_k-o_k-ei_k-oi-k",
-        "rae-rao-rih-ruh-raw-rey-royr → r-e_r-o_r-i_r-a_r-o_r-ei_r-oi-r",
-        "sae-sao-sih-suh-saw-sey-soys → s-e_s-o_s-i_s-a_s-o_s-ei_s-oi-s",
-        "shae-shao-shih-shuh-shaw-shey-shoysh → sh-e_sh-o_sh-i_sh-a_sh-o_sh-ei_sh-oi-sh",
-        "tae-tao-tih-tuh-taw-tey-toyt → t-e_t-o_t-i_t-a_t-o_t-ei_t-oi-t",
-        "vae-vao-vih-vuh-vaw-vey-voyv → v-e_v-o_v-i_v-a_v-o_v-ei_v-oi-v",
-        "wae-wao-wih-wuh-waw-wey-woyw → w-e_w-o_w-i_w-a_w-o_w-ei_w-oi-w",
-        "yae-yao-yih-yuh-yaw-yey-yoyy → y-e_y-o_y-i_y-a_y-o_y-ei_y-oi-y",
-        "zae-zao-zih-zuh-zaw-zey-zoyz → z-e_z-o_z-i_z-a_z-o_z-ei_z-oi-z",
-        # 新增的音节组合
-        "thae-thao-thih-thuh-thaw-they-thoyth → th-e_th-o_th-i_th-a_th-o_th-ei_th-oi-th",
-        "zhae-zhao-zhih-zhuh-zhaw-zhey-zhoyzh → zh-e_zh-o_zh-i_zh-a_zh-o_zh-ei_zh-oi-zh",
-        "thah-thax-ther-thahth-thaxth-therth → th-a_th-ax_th-er_th-a-th_th-ax-th_th-er-th",
-        "bah-bao-bih-buh-baw-bey-boyb → b-a_b-o_b-i_b-a_b-o_b-ei_b-oi-b",
-        "bah-bax-ber-bahb-baxb-berb → b-a_b-ax_b-er_b-a-b_b-ax-b_b-er-b",
-        "pah-pao-pih-puh-paw-pey-poyp → p-a_p-o_p-i_p-a_p-o_p-ei_p-oi-p",
-        "pah-pax-per-pahp-paxp-perp → p-a_p-ax_p-er_p-a-p_p-ax-p_p-er-p",
-        "dah-dao-dih-duh-daw-dey-doyd → d-a_d-o_d-i_d-a_d-o_d-ei_d-oi-d",
-        "dah-dax-der-dahd-daxd-derd → d-a_d-ax_d-er_d-a-d_d-ax-d_d-er-d",
-        "tah-tao-tih-tuh-taw-tey-toyt → t-a_t-o_t-i_t-a_t-o_t-ei_t-oi-t",
-        "tah-tax-ter-taht-taxt-tert → t-a_t-ax_t-er_t-a-t_t-ax-t_t-er-t",
-        "gah-gao-gih-guh-gaw-gey-goyg → g-a_g-o_g-i_g-a_g-o_g-ei_g-oi-g",
-        "gah-gax-ger-gahg-gaxg-gerg → g-a_g-ax_g-er_g-a-g_g-ax-g_g-er-g",
-        "kah-kao-kih-kuh-kaw-key-koyk → k-a_k-o_k-i_k-a_k-o_k-ei_k-oi-k",
-        "kah-kax-ker-kahk-kaxk-kerk → k-a_k-ax_k-er_k-a-k_k-ax-k_k-er-k",
-        "vah-vao-vih-vuh-vaw-vey-voyv → v-a_v-o_v-i_v-a_v-o_v-ei_v-oi-v",
-        "vah-vax-ver-vahv-vaxv-verv → v-a_v-ax_v-er_v-a-v_v-ax-v_v-er-v",
-        "fah-fao-fih-fuh-faw-fey-foyf → f-a_f-o_f-i_f-a_f-o_f-ei_f-oi-f",
-        "fah-fax-fer-fahf-faxf-ferf → f-a_f-ax_f-er_f-a-f_f-ax-f_f-er-f",
-        "dhah-dhao-dhih-dhuh-dhaw-dhey-dhoydh → th-a_th-o_th-i_th-a_th-o_th-ei_th-oi-th",
-        "dhah-dhax-dher-dhahdh-dhaxdh-dherdh → th-a_th-ax_th-er_th-a-th_th-ax-th_th-er-th",
-        "zah-zao-zih-zuh-zaw-zey-zoyz → z-a_z-o_z-i_z-a_z-o_z-ei_z-oi-z",
-        "zah-zax-zer-zahz-zaxz-zerz → z-a_z-ax_z-er_z-a-z_z-ax-z_z-er-z",
-        "sah-sao-sih-suh-saw-sey-soys → s-a_s-o_s-i_s-a_s-o_s-ei_s-oi-s",
-        "sah-sax-ser-sahs-saxs-sers → s-a_s-ax_s-er_s-a-s_s-ax-s_s-er-s",
-        "zhah-zhao-zhih-zhuh-zhaw-zhey-zhoyzh → zh-a_zh-o_zh-i_zh-a_zh-o_zh-ei_zh-oi-zh",
-        "zhah-zhax-zher-zhahzh-zhaxzh-zherzh → zh-a_zh-ax_zh-er_zh-a-zh_zh-ax-zh_zh-er-zh",
-        "shah-shao-shih-shuh-shaw-shey-shoysh → sh-a_sh-o_sh-i_sh-a_sh-o_sh-ei_sh-oi-sh",
-        "shah-shax-sher-shahsh-shaxsh-shersh → sh-a_sh-ax_sh-er_sh-a-sh_sh-ax-sh_sh-er-sh",
-        "jah-jao-jih-juh-jaw-jey-joyj → j-a_j-o_j-i_j-a_j-o_j-ei_j-oi-j",
-        "jah-jax-jher-jahjh-jaxjh-jherjh → j-a_j-ax_j-er_j-a-j_j-ax-j_j-er-j",
-        "chah-chao-chih-chuh-chaw-chey-choych → ch-a_ch-o_ch-i_ch-a_ch-o_ch-ei_ch-oi-ch",
-        "chah-chax-cher-chahch-chaxch-cherch → ch-a_ch-ax_ch-er_ch-a-ch_ch-ax-ch_ch-er-ch",
-        "hha-hhao-hhih-hhuh-hhaw-hhey-hhoyhh → h-a_h-o_h-i_h-a_h-o_h-ei_h-oi-h",
-        "hha-hhax-hher-hhahh-hhaxh-hherh → h-a_h-ax_h-er_h-a-h_h-ax-h_h-er-h",
-        "lah-lao-lih-luh-law-ley-loyl → l-a_l-o_l-i_l-a_l-o_l-ei_l-oi-l",
-        "lah-lax-ler-lahl-laxl-lerl → l-a_l-ax_l-er_l-a-l_l-ax-l_l-er-l",
-        "rah-rao-rih-ruh-raw-rey-royr → r-a_r-o_r-i_r-a_r-o_r-ei_r-oi-r",
-        "rah-rax-rer-rahr-raxr-rerr → r-a_r-ax_r-er_r-a-r_r-ax-r_r-er-r",
-        "yah-yao-yih-yuh-yaw-yey-yoyy → y-a_y-o_y-i_y-a_y-o_y-ei_y-oi-y",
-        "yah-yax-yer-yahy-yaxy-yery → y-a_y-ax_y-er_y-a-y_y-ax-y_y-er-y",
-        "wah-wao-wih-wuh-waw-wey-woyw → w-a_w-o_w-i_w-a_w-o_w-ei_w-oi-w",
-        "wah-wax-wer-wahw-waxw-werw → w-a_w-ax_w-er_w-a-w_w-ax-w_w-er-w",
-        "mah-mao-mih-muh-maw-mey-moym → m-a_m-o_m-i_m-a_m-o_m-ei_m-oi-m",
-        "mah-max-mer-mahm-maxm-merm → m-a_m-ax_m-er_m-a-m_m-ax-m_m-er-m",
-        "nah-nao-nih-nuh-naw-ney-noyn → n-a_n-o_n-i_n-a_n-o_n-ei_n-oi-n",
-        "nah-nax-ner-nahn-naxn-ner → n-a_n-ax_n-er_n-a-n_n-ax-n_n-er-n",
-        "ngah-ngao-ngih-nguh-ngaw-ngey-ngoyng → ng-a_ng-o_ng-i_ng-a_ng-o_ng-ei_ng-oi-ng",
-        "ngah-ngax-nger-ngahng-ngaxng-ngerng → ng-a_ng-ax_ng-er_ng-a-ng_ng-ax-ng_ng-er-ng",
-        # 新增的录音表
-        "ae-aa-ae-iy-ae-uw-ae → ae_aa_ae_iy_ae_uw_ae",
-        "ae-eh-ae-ow-ae-ay-ae → ae_eh_ae_ow_ae_ay_ae",
-        "iy-aa-iy-eh-iy-ow-iy → iy_aa_iy_eh_iy_ow_iy",
-        "iy-uw-iy-ay-iy-aa-iy → iy_uw_iy_ay_iy_aa_iy",
-        "uw-eh-uw-ay-uw-aa-uw → uw_eh_uw_ay_uw_aa_uw",
-        "eh-iy-eh-uw-eh-ay-eh → eh_iy_eh_uw_eh_ay_eh",
-        "ay-aa-ay-iy-ay-uw-ay → ay_aa_ay_iy_ay_uw_ay",
-        "oy-eh-oy-ow-oy-aa-oy → oy_eh_oy_ow_oy_aa_oy",
-        "bey-boy-baa-biy-buw-bey → b-ey_b-oy_b-aa_b-iy_b-uw_b-ey",
-        "pey-poy-paa-piy-puw-pey → p-ey_p-oy_p-aa_p-iy_p-uw_p-ey",
-        "dey-doy-daa-diy-duw-dey → d-ey_d-oy_d-aa_d-iy_d-uw_d-ey",
-        "tey-toy-taa-tiy-tuw-tey → t-ey_t-oy_t-aa_t-iy_t-uw_t-ey",
-        "gey-goy-gaa-giy-guw-gey → g-ey_g-oy_g-aa_g-iy_g-uw_g-ey",
-        "key-koy-kaa-kiy-kuw-key → k-ey_k-oy_k-aa_k-iy_k-uw_k-ey",
-        "vey-voy-vaa-viy-vuw-vey → v-ey_v-oy_v-aa_v-iy_v-uw_v-ey",
-        "fey-foy-faa-fiy-fuw-fey → f-ey_f-oy_f-aa_f-iy_f-uw_f-ey",
-        "thew-thoy-thaa-thiy-thuw-thew → th-ew_th-oy_th-aa_th-iy_th-uw_th-ew",
-        "zhey-zhoy-zhaa-zhiy-zhuw-zhey → zh-ey_zh-oy_zh-aa_zh-iy_zh-uw_zh-ey",
-        "jey-joy-jhaa-jhiy-jhuw-jey → j-ey_j-oy_j-aa_j-iy_j-uw_j-ey",
-        "chey-choy-chaa-chiy-chuw-chey → ch-ey_ch-oy_ch-aa_ch-iy_ch-uw_ch-ey",
-        "hhey-hhoy-hhaa-hhiy-hhuw-hhey → hh-ey_hh-oy_hh-aa_hh-iy_hh-uw_hh-ey",
-        "ley-loy-laa-liy-luw-ley → l-ey_l-oy_l-aa_l-iy_l-uw_l-ey",
-        "rey-roy-raa-riy-ruw-rey → r-ey_r-oy_r-aa_r-iy_r-uw_r-ey",
-        "yey-yoy-yaa-yiy-yuw-yey → y-ey_y-oy_y-aa_y-iy_y-uw_y-ey",
-        "wey-woy-waa-wiy-wuw-wey → w-ey_w-oy_w-aa_w-iy_w-uw_w-ey",
-        "mey-moy-maa-miy-muw-mey → m-ey_m-oy_m-aa_m-iy_m-uw_m-ey",
-        "ney-noy-naa-niy-nuw-ney → n-ey_n-oy_n-aa_n-iy_n-uw_n-ey",
-        "ngey-ngoy-ngaa-ngiy-nguw-ngey → ng-ey_ng-oy_ng-aa_ng-iy_ng-uw_ng-ey",
-        "sey-soy-saa-siy-suw-sey → s-ey_s-oy_s-aa_s-iy_s-uw_s-ey",
-        "zey-zoy-zaa-ziy-zuw-zey → z-ey_z-oy_z-aa_z-iy_z-uw_z-ey",
-        "shey-shoy-shaa-shiy-shuw-shey → sh-ey_sh-oy_sh-aa_sh-iy_sh-uw_sh-ey"
-    ]
 
-    # 创建输出目录
-    os.makedirs(output_dir, exist_ok=True)
+    # 命令行参数（未指定时使用上面的路径配置）
+    parser = argparse.ArgumentParser(description="UTAU英语CVVC音源自动拼接生成器")
+    parser.add_argument('--consonant-dir', action='append', dest='consonant_dirs',
+                        help="辅音目录或ZIP音源包（如 addC.zip），可多次指定，按优先级排列")
+    parser.add_argument('--vowel-dir', default=vowel_dir, help="元音目录或ZIP音源包")
+    parser.add_argument('--output-dir', default=output_dir, help="输出目录")
+    parser.add_argument('--mapping', metavar='FILE',
+                        help="映射文件（每行“目标名称 → 映射”），未指定时使用内置映射表")
+    parser.add_argument('--reclist', metavar='FILE',
+                        help="录音表（每行一个目标名称），只生成其中列出的录音并按其顺序排列；"
+                             "输出目录中不在录音表里的旧输出会保留（--prune时删除）")
+    parser.add_argument('--prune', action='store_true',
+                        help="配合--reclist使用：删除输出目录中不在录音表里的旧输出")
+    parser.add_argument('--jobs', metavar='FILE',
+                        help="批量任务列表（JSON数组，每项指定consonant_dirs、vowel_dir和output_dir），"
+                             "所有任务共用录音表和工作池，错误报告合并写入任务文件所在目录")
+    parser.add_argument('--backend', choices=sorted(AUDIO_BACKENDS), default='list',
+                        help="音频后端：list（纯Python）或 numpy（向量化）")
+    parser.add_argument('--fade-curve', choices=['linear', 'equal_power'], default=FADE_CURVE,
+                        help="交叉淡化曲线")
+    parser.add_argument('--no-convert', action='store_true',
+                        help="不自动转换非单声道/非16位/非44.1kHz的音源，将其视为错误")
+    parser.add_argument('--convert-cache', default=CONVERT_CACHE_DIR, metavar='DIR',
+                        help="格式转换缓存目录（按源文件内容缓存，之后的运行不再转换）")
+    parser.add_argument('--match-gain', choices=['peak', 'rms'],
+                        help="读取音源时按峰值或均方根把每个文件调整到同一电平（增益按文件缓存）")
+    parser.add_argument('--gain-cache', default=SOURCE_GAINS_CACHE, metavar='PATH',
+                        help="音源增益缓存文件（所有任务和工作进程共用，由主进程写入），空字符串表示不缓存")
+    parser.add_argument('--source-level', type=float, metavar='DBFS',
+                        help=f"音源增益匹配的目标电平（默认peak {SOURCE_LEVELS['peak']}，rms {SOURCE_LEVELS['rms']}）")
+    parser.add_argument('--normalize', choices=['peak', 'rms'],
+                        help="按峰值或均方根归一化每个输出文件（同时统计削波采样）")
+    parser.add_argument('--output-level', type=float, metavar='DBFS',
+                        help=f"输出归一化的目标电平（默认peak {OUTPUT_LEVELS['peak']}，rms {OUTPUT_LEVELS['rms']}）")
+    parser.add_argument('--count-clips', action='store_true',
+                        help="统计每个输出文件中的满幅（削波）采样数")
+    parser.add_argument('--sample-cache-mb', type=float, default=SAMPLE_BANK_MAX_BYTES / 1024 / 1024,
+                        help="样本缓存上限（MiB，按所选后端的内存占用计算）")
+    parser.add_argument('--syllable-cache-mb', type=float, default=SYLLABLE_CACHE_MAX_BYTES / 1024 / 1024,
+                        help="音节渲染缓存上限（MiB），0表示不缓存已拼接的音节")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="并行渲染的工作数，0表示使用全部CPU核心（默认1，顺序渲染）")
+    parser.add_argument('--pool', choices=['process', 'thread', 'pipeline'], default='process',
+                        help="并行方式：process（进程池）、thread（线程池，适合I/O密集场景）或 "
+                             "pipeline（预读、混音、写入三个阶段流水线重叠进行，适合网络共享上的音源，忽略--workers）")
+    parser.add_argument('--check', action='store_true',
+                        help="只预检录音表（解析映射、查找音源、读取文件头检查格式和时长、"
+                             "检查被截短的交叉淡化），不渲染音频；有错误时返回1")
+    parser.add_argument('--force', action='store_true',
+                        help="忽略增量构建清单，重新生成全部文件")
+    parser.add_argument('--no-oto', action='store_true',
+                        help="不生成oto.ini")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="记录各阶段耗时并写入JSON摘要（同名.csv为每条录音的明细）")
+    parser.add_argument('--profile-top', type=int, default=10,
+                        help="统计报告中列出的最慢录音条数")
+    args = parser.parse_args(argv)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    config = RenderConfig(tuple(args.consonant_dirs or consonant_dirs), args.vowel_dir,
+                          args.output_dir, args.backend, args.fade_curve, bool(args.profile),
+                          not args.no_convert, args.convert_cache, args.match_gain, args.source_level,
+                          args.gain_cache or None,
+                          args.normalize, args.output_level, args.count_clips,
+                          int(args.sample_cache_mb * 1024 * 1024), int(args.syllable_cache_mb * 1024 * 1024))
+    
+    # 批量模式：任务列表中的每个（音源目录 → 输出目录）各为一个任务，共用录音表、缓存和工作池
+    try:
+        configs = load_jobs(args.jobs, config) if args.jobs else [config]
+    except (OSError, ValueError) as e:
+        parser.error(f"无法读取任务文件 {args.jobs}: {e}")
+    renderers = {}
+    jobs = [BuildJob(get_renderer(renderers, job_config), job_config.output_dir if args.jobs else "")
+            for job_config in configs]
     error_reports = []
-    silence = generate_silence(SILENCE_DURATION)
 
-    # 处理每条录音
-    for line in mapping_table:
-        try:
-            # 解析目标名称和映射字符串
-            parts = line.split('→')
-            if len(parts) != 2:
-                raise ValueError(f"无效的映射行: {line}")
-            
-            target_name = parts[0].strip()
-            mapping_str = parts[1].strip()
-            
-            # 解析音素组件为音节列表
-            syllables = parse_mapping(mapping_str)
-            
-            # 处理每个音节
-            syllable_audio = []
-            for syllable in syllables:
-                audio, error = process_syllable(syllable, consonant_dirs, vowel_dir)
-                if error:
-                    raise RuntimeError(f"音节处理失败: {'-'.join(syllable)}: {error}")
-                syllable_audio.append(audio)
-            
-            # 拼接所有音节（添加静音间隔）
-            full_audio = []
-            for i, audio in enumerate(syllable_audio):
-                full_audio.extend(audio)
-                if i < len(syllable_audio) - 1:
-                    full_audio.extend(silence)
-            
-            # 生成输出路径
-            output_path = os.path.join(output_dir, f"{target_name}.wav")
-            
-            # 保存结果
-            error = write_wav(output_path, full_audio)
-            if error:
-                raise RuntimeError(f"保存失败: {error}")
-            
-            print(f"成功生成: {target_name}.wav")
-                
-        except Exception as e:
-            timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            error_reports.append(f"[{timestamp}] 处理失败: {line}\n错误信息: {str(e)}\n")
-            print(f"错误: {line} - {str(e)}")
+    # 读取录音表：--mapping指定映射文件（默认使用内置映射表），--reclist按录音表选择并排序
+    mapping_table = load_mapping_file(args.mapping) if args.mapping else list(DEFAULT_MAPPING_TABLE)
+    if args.reclist:
+        mapping_table, unmapped = select_reclist(mapping_table, load_reclist(args.reclist))
+        for name in unmapped:
+            result = LineResult.failure(name, "录音表中的条目没有对应的映射")
+            error_reports.append(result.report())
+            print(f"错误: {result.line} - {result.error}")
+
+    parsed = {}
+    if args.check:
+        return check_jobs(jobs, mapping_table, error_reports, parsed,
+                          os.path.dirname(os.path.abspath(args.jobs)) if args.jobs else config.output_dir)
+
+    for job in jobs:
+        job.prepare(mapping_table, args.force, parsed, prune=not args.reclist or args.prune)
+
+    # 处理所有任务的录音（并行渲染时结果仍按任务和录音表顺序输出）
+    tasks = [(job, plan) for job in jobs for plan in job.pending]
+    results = []
+    render_start = time.perf_counter()
+    for (job, plan), result in zip(tasks, render_tasks([(job.renderer, plan) for job, plan in tasks],
+                                                       workers, args.pool)):
+        results.append(result)
+        job.record(plan, result)
+    render_seconds = time.perf_counter() - render_start
+    for job in jobs:
+        job.finish(not args.no_oto)
+    if args.normalize or args.count_clips:
+        clipped = [result.clipped for result in results if result.clipped]
+        print(f"削波统计: {len(clipped)} 个文件共 {sum(clipped)} 个满幅采样")
+
+    if args.profile:
+        summary = summarize_profile(results, render_seconds, args.profile_top)
+        csv_path = write_profile(args.profile, summary)
+        print(f"性能统计: {summary['lines']} 条录音，耗时 {render_seconds:.2f} 秒，"
+              f"生成音频 {summary['audio_seconds']:.1f} 秒")
+        for stage in PROFILE_STAGES:
+            if stage in summary['stages']:
+                total = summary['stages'][stage]
+                print(f"  {stage}: {total['seconds']:.3f} 秒，{total['calls']} 次，"
+                      f"{total['samples']} 采样，{total['bytes']} 字节")
+        print(f"最慢的 {len(summary['slowest'])} 条录音:")
+        for line in summary['slowest']:
+            print(f"  {line['seconds'] * 1000:.1f} ms  {line['target'] or line['line']}")
+        print(f"统计结果已保存至: {args.profile}，{csv_path}")
+
+    if workers <= 1 or args.pool != 'process':
+        for renderer in {id(renderer.bank): renderer for renderer in renderers.values()}.values():
+            print(renderer.bank.stats())
+            if renderer.syllables is not None:
+                print(renderer.syllables.stats())
 
-    # 写入错误报告
+    # 写入错误报告（批量模式下所有任务合并为一份，按任务分组）
+    for job in jobs:
+        if job.error_reports and job.label:
+            error_reports.append(f"任务: {job.label}\n" + "-"*50)
+        error_reports.extend(job.error_reports)
     if error_reports:
-        report_path = os.path.join(output_dir, "error_report.txt")
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(f"音频处理错误报告（生成时间：{datetime.datetime.now()}）\n")
-            f.write("="*50 + "\n")
-            f.write("\n".join(error_reports))
+        report_dir = os.path.dirname(os.path.abspath(args.jobs)) if args.jobs else config.output_dir
+        os.makedirs(report_dir, exist_ok=True)
+        report_path = write_error_report(report_dir, error_reports)
         print(f"错误报告已保存至: {report_path}")
     else:
         print("所有音频处理完成，无错误")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""autoeng.py 性能基准测试
+
+生成指定规模的合成音源（44.1kHz/16位单声道），对解析、路径查找、读取、
+交叉淡化、音节拼接和整表渲染计时，输出每秒生成的音频秒数和内存峰值。
+结果保存为JSON，可用 --compare 与之前的结果对比，发现热点路径的性能退化。
+
+用法示例：
+    python benchmark.py --output bench.json
+    python benchmark.py --backend numpy --compare bench.json
+"""
+import os
+import sys
+import json
+import math
+import wave
+import random
+import struct
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+import time
+from typing import Callable, List, Tuple
+
+import autoeng
+
+def _write_tone(path: str, samples: List[int]):
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(autoeng.CHANNELS)
+        wf.setsampwidth(autoeng.SAMPLE_WIDTH)
+        wf.setframerate(autoeng.SAMPLE_RATE)
+        wf.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+
+def _noise(rng: random.Random, count: int) -> List[int]:
+    """辅音：带包络的噪声"""
+    return [int(rng.uniform(-1, 1) * 12000 * math.sin(math.pi * i / count)) for i in range(count)]
+
+def _vowel(freq: float, count: int) -> List[int]:
+    """元音：正弦波加二次谐波"""
+    step = 2 * math.pi * freq / autoeng.SAMPLE_RATE
+    return [int(9000 * math.sin(step * i) + 3000 * math.sin(2 * step * i)) for i in range(count)]
+
+def build_bank(root: str, consonants: int, vowels: int, consonant_ms: float, vowel_ms: float,
+               dirs: int, seed: int = 0) -> Tuple[List[str], str, List[str], List[str]]:
+    """生成合成音源，返回（辅音目录列表, 元音目录, 辅音名列表, 元音名列表）
+
+    辅音名取自autoeng.CONSONANTS（parse_mapping只识别其中的辅音），数量以此为上限；
+    辅音文件按轮流方式分布到各辅音目录，-n/-ng放在第一个目录。
+    """
+    rng = random.Random(seed)
+    consonant_dirs = [os.path.join(root, f"consonants{i}") for i in range(dirs)]
+    vowel_dir = os.path.join(root, "vowels")
+    for directory in consonant_dirs + [vowel_dir]:
+        os.makedirs(directory, exist_ok=True)
+
+    consonant_names = [name for name in autoeng.CONSONANTS if name not in ('n', 'ng')][:consonants]
+    vowel_names = [f"v{i}" for i in range(vowels)]
+
+    consonant_len = int(consonant_ms / 1000 * autoeng.SAMPLE_RATE)
+    vowel_len = int(vowel_ms / 1000 * autoeng.SAMPLE_RATE)
+    for i, name in enumerate(consonant_names):
+        _write_tone(os.path.join(consonant_dirs[i % dirs], f"{name}-.wav"), _noise(rng, consonant_len))
+    for name in ('n', 'ng'):
+        _write_tone(os.path.join(consonant_dirs[0], f"-{name}.wav"), _vowel(180, consonant_len))
+    for i, name in enumerate(vowel_names):
+        _write_tone(os.path.join(vowel_dir, f"{name}.wav"), _vowel(200 + 40 * i, vowel_len))
+    return consonant_dirs, vowel_dir, consonant_names, vowel_names
+
+def build_reclist(consonant_names: List[str], vowel_names: List[str], lines: int,
+                  seed: int = 0) -> List[str]:
+    """生成合成录音表：每行6个音节，混合纯元音、CV、CVC和n/ng结尾"""
+    rng = random.Random(seed)
+    table = []
+    for i in range(lines):
+        syllables = []
+        for j in range(6):
+            vowel = rng.choice(vowel_names)
+            kind = (i + j) % 4
+            consonant = rng.choice(consonant_names)
+            if kind == 0:
+                syllables.append(vowel)
+            elif kind == 1:
+                syllables.append(f"{consonant}-{vowel}")
+            elif kind == 2:
+                syllables.append(f"{consonant}-{vowel}-{consonant}")
+            else:
+                syllables.append(f"{consonant}-{vowel}-{rng.choice(['n', 'ng'])}")
+        table.append(f"line{i:04d} → {'_'.join(syllables)}")
+    return table
+
+def timed(func: Callable[[], int], repeat: int) -> Tuple[float, int]:
+    """重复执行func，返回（最短耗时, 操作次数）"""
+    best = float('inf')
+    ops = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ops = func()
+        best = min(best, time.perf_counter() - start)
+    return best, ops
+
+def run_benchmarks(args) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="autoeng_bench_") as root:
+        consonant_dirs, vowel_dir, consonant_names, vowel_names = build_bank(
+            os.path.join(root, "bank"), args.consonants, args.vowels,
+            args.consonant_ms, args.vowel_ms, args.dirs, args.seed)
+        table = build_reclist(consonant_names, vowel_names, args.lines, args.seed)
+        mappings = [autoeng.split_mapping_line(line)[1] for line in table]
+        syllables = [syl for mapping in mappings for syl in autoeng.parse_mapping(mapping)]
+        components = [comp for syl in syllables for comp in syl]
+        backend = autoeng.get_backend(args.backend)
+        paths = sorted({autoeng.component_to_path(comp, consonant_dirs, vowel_dir) for comp in components})
+
+        def bench_parse():
+            for mapping in mappings:
+                autoeng.parse_mapping(mapping)
+            return len(mappings)
+
+        def bench_component_to_path():
+            for comp in components:
+                autoeng.component_to_path(comp, consonant_dirs, vowel_dir)
+            return len(components)
+
+        def bench_phoneme_index():
+            index = autoeng.PhonemeIndex(consonant_dirs, vowel_dir)
+            for comp in components:
+                index.resolve(comp)
+            return len(components)
+
+        def bench_read_wav():
+            for path in paths:
+                backend.load(path)
+            return len(paths)
+
+        consonant, _ = backend.load(paths[0])
+        vowel, _ = backend.load(autoeng.component_to_path(vowel_names[0], consonant_dirs, vowel_dir))
+        fade = min(len(consonant), len(vowel)) // 2
+
+        def bench_cross_fade():
+            for _ in range(args.fades):
+                backend.cross_fade(consonant, vowel, fade)
+            return args.fades
+
+        def bench_process_syllable():
+            bank = autoeng.SampleBank(loader=backend.load)
+            index = autoeng.PhonemeIndex(consonant_dirs, vowel_dir)
+            for syllable in syllables:
+                autoeng.process_syllable(syllable, consonant_dirs, vowel_dir, bank, backend, index)
+            return len(syllables)
+
+        output_dir = os.path.join(root, "output")
+        os.makedirs(output_dir, exist_ok=True)
+        config = autoeng.RenderConfig(tuple(consonant_dirs), vowel_dir, output_dir, args.backend)
+
+        def bench_render():
+            renderer = autoeng.Renderer(config)
+            for line in table:
+                result = renderer.render_line(line)
+                if result.error:
+                    raise RuntimeError(result.error)
+            return len(table)
+
+        for name, func in [('parse_mapping', bench_parse),
+                           ('component_to_path', bench_component_to_path),
+                           ('phoneme_index', bench_phoneme_index),
+                           ('read_wav', bench_read_wav),
+                           ('cross_fade', bench_cross_fade),
+                           ('process_syllable', bench_process_syllable),
+                           ('render', bench_render)]:
+            seconds, ops = timed(func, args.repeat)
+            results[name] = {'seconds': seconds, 'ops': ops, 'ops_per_second': ops / seconds if seconds else None}
+            print(f"{name:>18}: {seconds * 1000:9.2f} ms  ({ops} 次)")
+
+        # 整表渲染吞吐量：每秒生成的音频秒数
+        audio_seconds = 0.0
+        for target in os.listdir(output_dir):
+            with wave.open(os.path.join(output_dir, target), 'rb') as wf:
+                audio_seconds += wf.getnframes() / wf.getframerate()
+        results['render']['audio_seconds'] = audio_seconds
+        results['render']['audio_seconds_per_second'] = audio_seconds / results['render']['seconds']
+        print(f"{'throughput':>18}: {results['render']['audio_seconds_per_second']:9.1f} 秒音频/秒")
+
+        # 内存峰值单独测量（tracemalloc会拖慢计时）
+        tracemalloc.start()
+        bench_render()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results['render']['peak_memory_bytes'] = peak
+        print(f"{'peak memory':>18}: {peak / 1024 / 1024:9.2f} MiB")
+    return results
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ''
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """对比两次结果，返回耗时增加超过threshold（比例）的项目"""
+    regressions = []
+    for name, result in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or not previous.get('seconds'):
+            continue
+        ratio = result['seconds'] / previous['seconds']
+        marker = "  <-- 退化" if ratio > 1 + threshold else ""
+        print(f"{name:>18}: {previous['seconds'] * 1000:9.2f} ms → {result['seconds'] * 1000:9.2f} ms "
+              f"({(ratio - 1) * 100:+.1f}%){marker}")
+        if marker:
+            regressions.append(name)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="autoeng.py 性能基准测试（使用合成音源）")
+    parser.add_argument('--consonants', type=int, default=40, help="辅音数量（上限为CONSONANTS中的辅音数）")
+    parser.add_argument('--vowels', type=int, default=12, help="元音数量")
+    parser.add_argument('--consonant-ms', type=float, default=150, help="辅音时长（毫秒）")
+    parser.add_argument('--vowel-ms', type=float, default=450, help="元音时长（毫秒）")
+    parser.add_argument('--dirs', type=int, default=2, help="辅音目录数量")
+    parser.add_argument('--lines', type=int, default=60, help="录音表行数")
+    parser.add_argument('--fades', type=int, default=200, help="cross_fade测试的调用次数")
+    parser.add_argument('--repeat', type=int, default=3, help="每项重复次数（取最短耗时）")
+    parser.add_argument('--backend', choices=sorted(autoeng.AUDIO_BACKENDS), default='list', help="音频后端")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('--output', help="结果保存路径（JSON）")
+    parser.add_argument('--compare', metavar='BASELINE', help="与之前保存的结果对比")
+    parser.add_argument('--threshold', type=float, default=0.2, help="判定为退化的耗时增加比例")
+    args = parser.parse_args(argv)
+
+    params = {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'threshold')}
+    report = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': params,
+        'results': run_benchmarks(args),
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"结果已保存至: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') != params:
+            print("警告: 基准参数与本次不同，对比结果可能不可比")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"发现性能退化: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""autoeng.py 拼接回归检查
+
+生成小规模合成音源（与 benchmark.py 相同），检查：
+1. 每个1~3组件音节的拼接结果与最初版本的拼接算法（下面的 reference_syllable）逐采样相同；
+2. 列表后端和numpy后端（两种淡化曲线）渲染的整表输出逐字节相同。
+两项检查分别在BANK_SHAPES的每种音源时长下进行，覆盖韵尾淡化受元音时长和受韵尾音源时长限制两种情况。
+
+修改拼接、淡化或后端代码后运行，有差异时返回1。
+
+用法示例：
+    python regression.py
+    python regression.py --lines 40 --seed 3
+"""
+import os
+import sys
+import wave
+import struct
+import argparse
+import tempfile
+from typing import Dict, List
+
+import autoeng
+from benchmark import build_bank, build_reclist
+
+# 合成音源的（辅音毫秒, 元音毫秒）：前者韵尾淡化由元音时长决定，后者被韵尾音源时长截短
+BANK_SHAPES = [(150, 300), (100, 600)]
+
+def _read_samples(path: str) -> List[int]:
+    with wave.open(path, 'rb') as wf:
+        return list(struct.unpack(f"<{wf.getnframes()}h", wf.readframes(wf.getnframes())))
+
+def _reference_cross_fade(data1: List[int], data2: List[int], fade_samples: int) -> List[int]:
+    """最初版本的线性交叉淡化"""
+    if fade_samples <= 0:
+        return data1 + data2
+    fade_len = min(fade_samples, len(data1), len(data2))
+    mixed = []
+    for i in range(fade_len):
+        sample = int(data1[-(fade_len - i)] * (1.0 - i / fade_len) + data2[i] * (i / fade_len))
+        mixed.append(max(-32768, min(32767, sample)))
+    return data1[:-fade_len] + mixed + data2[fade_len:]
+
+def reference_syllable(syllable: List[str], audio_data: List[List[int]]) -> List[int]:
+    """最初版本的音节拼接（只支持1~3个组件：V、CV、CVC）"""
+    if len(syllable) == 1:
+        return audio_data[0]
+    consonant1, vowel = audio_data[:2]
+    overlap_start = int(len(consonant1) * autoeng.CONSONANT_OVERLAP_PERCENT)
+    overlap_len = min(len(consonant1) - overlap_start, len(vowel))
+    mid_data = (consonant1[:overlap_start]
+                + _reference_cross_fade(consonant1[overlap_start:overlap_start + overlap_len],
+                                        vowel[:overlap_len], overlap_len)
+                + vowel[overlap_len:])
+    if len(syllable) == 2:
+        return mid_data
+    consonant2 = audio_data[2]
+    fade_len = int(len(vowel) * autoeng.END_CONSONANT_FADE_PERCENT)
+    if syllable[2] in ('n', 'ng'):
+        fade_len = min(fade_len, len(mid_data), len(consonant2))
+        return mid_data[:-fade_len] + _reference_cross_fade(mid_data[-fade_len:], consonant2[:fade_len], fade_len)
+    fade_len = min(fade_len, len(mid_data), int(len(consonant2) * 0.9))
+    return (mid_data[:-fade_len] + _reference_cross_fade(mid_data[-fade_len:], consonant2[:fade_len], fade_len)
+            + consonant2[fade_len:])
+
+def check_reference(syllables: List[List[str]], consonant_dirs: List[str], vowel_dir: str) -> List[str]:
+    """逐个音节对比当前实现（两种后端）与最初版本的拼接结果，返回不一致的音节"""
+    index = autoeng.PhonemeIndex(consonant_dirs, vowel_dir)
+    samples: Dict[str, List[int]] = {}
+    backends = [autoeng.get_backend(name) for name in autoeng.AUDIO_BACKENDS if name != 'numpy' or autoeng.np]
+    mismatched = []
+    for syllable in syllables:
+        paths = [index.resolve(comp) for comp in syllable]
+        audio_data = [samples.setdefault(path, _read_samples(path)) for path in paths]
+        expected = reference_syllable(syllable, audio_data)
+        for backend in backends:
+            data, error = autoeng.process_syllable(syllable, consonant_dirs, vowel_dir, backend=backend, index=index)
+            if error or [int(v) for v in data] != expected:
+                mismatched.append(f"{'-'.join(syllable)} ({backend.name}): {error or '采样不一致'}")
+    return mismatched
+
+def render_outputs(table: List[str], consonant_dirs: List[str], vowel_dir: str, output_dir: str,
+                   backend: str, curve: str) -> Dict[str, bytes]:
+    """渲染整表，返回（文件名 → 文件内容）"""
+    config = autoeng.RenderConfig(tuple(consonant_dirs), vowel_dir, output_dir, backend, curve)
+    os.makedirs(output_dir, exist_ok=True)
+    renderer = autoeng.Renderer(config)
+    for line in table:
+        result = renderer.render_line(line)
+        if result.error:
+            raise RuntimeError(f"{line}: {result.error}")
+    outputs = {}
+    for name in sorted(os.listdir(output_dir)):
+        with open(os.path.join(output_dir, name), 'rb') as f:
+            outputs[name] = f.read()
+    return outputs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="autoeng.py 拼接回归检查（使用合成音源）")
+    parser.add_argument('--consonants', type=int, default=12, help="辅音数量")
+    parser.add_argument('--vowels', type=int, default=5, help="元音数量")
+    parser.add_argument('--lines', type=int, default=12, help="每种音源时长的录音表行数")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    args = parser.parse_args(argv)
+
+    failures = []
+    for consonant_ms, vowel_ms in BANK_SHAPES:
+        with tempfile.TemporaryDirectory(prefix="autoeng_regression_") as root:
+            print(f"音源时长: 辅音 {consonant_ms} ms，元音 {vowel_ms} ms")
+            consonant_dirs, vowel_dir, consonant_names, vowel_names = build_bank(
+                os.path.join(root, "bank"), args.consonants, args.vowels, consonant_ms, vowel_ms, 2, args.seed)
+            table = build_reclist(consonant_names, vowel_names, args.lines, args.seed)
+            syllables = [syl for line in table
+                         for syl in autoeng.parse_mapping(autoeng.split_mapping_line(line)[1])]
+
+            mismatched = check_reference(syllables, consonant_dirs, vowel_dir)
+            print(f"  最初版本拼接算法对比: {len(syllables)} 个音节，{len(mismatched)} 个不一致")
+            failures.extend(mismatched)
+
+            if autoeng.np is None:
+                print("  未安装numpy，跳过后端一致性检查")
+                continue
+            for curve in ('linear', 'equal_power'):
+                outputs = {backend: render_outputs(table, consonant_dirs, vowel_dir,
+                                                   os.path.join(root, f"{backend}_{curve}"), backend, curve)
+                           for backend in ('list', 'numpy')}
+                differing = [name for name in outputs['list']
+                             if outputs['list'][name] != outputs['numpy'].get(name)]
+                print(f"  后端一致性（{curve}）: {len(outputs['list'])} 个文件，{len(differing)} 个不一致")
+                failures.extend(f"{name} ({curve}): 列表后端与numpy后端输出不同" for name in differing)
+
+    for failure in failures:
+        print(f"  {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())